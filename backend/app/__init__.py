@@ -5,6 +5,9 @@ from dotenv import load_dotenv
 from flask_cors import CORS
 from flask_migrate import Migrate
 
+from app.utils.db_pool import RoutingSession, engine_options, replica_binds
+from app.utils.json_provider import json_provider
+
 
 # Load environment variables
 load_dotenv()
@@ -12,12 +15,50 @@ load_dotenv()
 app = Flask(__name__)
 app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL") # load SQLALCHEMY_DATABASE_URI
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config["SQLALCHEMY_DATABASE_URI"]) # connection pool (DB_POOL_*)
+app.config["SQLALCHEMY_BINDS"] = replica_binds(os.getenv("DATABASE_REPLICA_URLS")) # read replicas, comma-separated URLs
+app.config["REPLICA_STICKY_SECONDS"] = float(os.getenv("REPLICA_STICKY_SECONDS", 5)) # reads go to the primary this long after a client's write
+app.config["REPLICA_RETRY_INTERVAL"] = float(os.getenv("REPLICA_RETRY_INTERVAL", 30)) # seconds a failed replica is left out of rotation
+# local keeps entries and invalidations in each worker, so other workers serve stale
+# data until RESPONSE_CACHE_TTL; only use it with a single worker
+app.config["RESPONSE_CACHE_BACKEND"] = os.getenv("RESPONSE_CACHE_BACKEND", "redis" if os.getenv("RESPONSE_CACHE_URL") else "none") # local, redis or none
+app.config["RESPONSE_CACHE_URL"] = os.getenv("RESPONSE_CACHE_URL", "redis://localhost:6379/0")
+# course writes reach the other workers' course caches through the redis response cache only
+app.config["COURSE_CACHE_TTL"] = float(os.getenv("COURSE_CACHE_TTL", 60 if app.config["RESPONSE_CACHE_BACKEND"] == "redis" else 0)) # seconds, 0 disables the course cache
+app.config["COURSE_CACHE_SIZE"] = int(os.getenv("COURSE_CACHE_SIZE", 1024))
+app.config["RESPONSE_CACHE_TTL"] = float(os.getenv("RESPONSE_CACHE_TTL", 30)) # seconds
+app.config["RESPONSE_CACHE_SIZE"] = int(os.getenv("RESPONSE_CACHE_SIZE", 512))
+app.config["READINESS_CACHE_TTL"] = float(os.getenv("READINESS_CACHE_TTL", 5)) # seconds between database probes of /ready
+app.config["ANALYTICS_CACHE_BUCKET"] = float(os.getenv("ANALYTICS_CACHE_BUCKET", 300)) # seconds per analytics report bucket, 0 disables caching
+app.config["ANALYTICS_CACHE_SIZE"] = int(os.getenv("ANALYTICS_CACHE_SIZE", 256))
+app.config["CHANGE_FEED_LAG"] = float(os.getenv("CHANGE_FEED_LAG", 5)) # seconds; the feed leaves out changes newer than this
+app.config["BULK_INSERT_BATCH_SIZE"] = int(os.getenv("BULK_INSERT_BATCH_SIZE", 1000)) # rows per bulk INSERT
+app.config["SERVER_TIMING"] = os.getenv("SERVER_TIMING", "false").lower() in ("1", "true", "yes") # Server-Timing header on every response
+app.config["SERVER_TIMING_STATEMENTS"] = int(os.getenv("SERVER_TIMING_STATEMENTS", 3)) # slowest statements listed in the header
+app.config["SLOW_QUERY_MS"] = float(os.getenv("SLOW_QUERY_MS", 500)) # log statements slower than this, 0 disables
+app.config["SLOW_QUERY_EXPLAIN"] = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes") # attach the EXPLAIN plan
+app.config["WORKER_THREADS"] = int(os.getenv("GUNICORN_THREADS", 4)) # request threads per gunicorn worker, as in gunicorn.conf.py
+app.config["ADMISSION_CONCURRENCY"] = os.getenv("ADMISSION_CONCURRENCY", "expensive={0},analytics={1},bulk={1}".format(
+    max(app.config["WORKER_THREADS"] // 2, 1), max(app.config["WORKER_THREADS"] // 4, 1))) # in-flight requests per route class per worker
+app.config["ADMISSION_QUEUE_TIMEOUT"] = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 0.1)) # seconds to wait for a slot before a 503
+app.config["ADMISSION_RETRY_AFTER"] = float(os.getenv("ADMISSION_RETRY_AFTER", 1)) # Retry-After seconds of a 503
+app.config["ADMISSION_ROUTES"] = os.getenv("ADMISSION_ROUTES", "") # endpoint=class overrides, e.g. get_all_courses=expensive
+app.config["RATE_LIMITS"] = os.getenv("RATE_LIMITS", "") # per-client token buckets, class=RATE:BURST
+app.config["RATE_LIMIT_BACKEND"] = os.getenv("RATE_LIMIT_BACKEND", "local") # local, redis or none
+app.config["RATE_LIMIT_URL"] = os.getenv("RATE_LIMIT_URL", "redis://localhost:6379/0")
+app.config["RATE_LIMIT_CLIENT_HEADER"] = os.getenv("RATE_LIMIT_CLIENT_HEADER", "") # e.g. X-Forwarded-For behind a proxy
+app.config["JSON_PROVIDER"] = os.getenv("JSON_PROVIDER", "orjson") # orjson (if installed) or default
+
+app.json = json_provider(app) # ISO 8601 dates, encoded with orjson when available
+app.config["CORS_ORIGINS"] = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "*").split(",")] # browser origins allowed to call the API, also used by the ASGI app
 
 CORS(app) # cross-origin request security
 
-db = SQLAlchemy(app)
+db = SQLAlchemy(app, session_options={"class_": RoutingSession}) # GET routes may read from a replica
 migrate = Migrate(app, db)
 
 
-from app.models import student, course, enrollment
-from app.routes import student_api, course_api
+from app.models import student, course, enrollment, tombstone
+from app.routes import student_api, course_api, analytics_api, search_api, changes_api, monitoring_api
+from app.utils import query_counter, metrics, replicas, profiling, admission
+from app import commands
@@ -0,0 +1,329 @@
+"""
+ASGI serving mode.
+
+The read endpoints that dominate traffic run here as async views over an
+async SQLAlchemy engine (aiomysql for MySQL, aiosqlite for SQLite), so one
+worker process can hold many concurrent connections while they wait on the
+database. Every other route is delegated to the Flask `app` unchanged,
+running in a thread pool, so the API surface is identical to the WSGI
+deployment.
+
+The async views bypass the Flask request hooks: they are not included in
+the Flask response cache, the Prometheus request metrics or X-Query-Count.
+Admission control applies to them through `admitted`, with the same route
+classes and limits as the Flask routes, counted per process.
+
+Run from backend/ (requires requirements-asgi.txt):
+    uvicorn asgi:app --host 0.0.0.0 --port 8080 --workers 4
+"""
+import asyncio
+import contextlib
+import functools
+import math
+import os
+
+from a2wsgi import WSGIMiddleware
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Mount, Route
+from werkzeug.exceptions import BadRequest, NotFound
+
+from app import app, db
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.student import Student
+from app.routes.course_api import COURSE_FIELDS, COURSE_FILTERS, COURSE_SORTS
+from app.routes.student_api import STUDENT_FIELDS, STUDENT_FILTERS, STUDENT_SORTS
+from app.utils import admission
+from app.utils.db_pool import engine_options
+from app.utils.filters import list_query
+from app.utils.pagination import STREAM_BATCH_SIZE, page_cursor, seek, wants_stream
+from app.utils.serializers import serialize_course, serialize_student
+
+
+# synchronous driver -> asyncio driver for the same database
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url():
+    """ASYNC_DATABASE_URL, or the app's DATABASE_URL switched to an asyncio driver"""
+    if os.getenv("ASYNC_DATABASE_URL"):
+        return make_url(os.getenv("ASYNC_DATABASE_URL"))
+
+    with app.app_context():
+        # the URL as resolved by Flask-SQLAlchemy (instance-relative SQLite paths, charset)
+        url = db.engine.url
+
+    if url.drivername not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No asyncio driver known for {url.drivername}; set ASYNC_DATABASE_URL")
+
+    return url.set(drivername=ASYNC_DRIVERS[url.drivername])
+
+
+def async_engine_options(url):
+    """The DB_POOL_* settings of the sync engine, on the asyncio-compatible pool"""
+    options = engine_options(url.render_as_string(hide_password=False))
+    options.pop("poolclass", None)
+    return options
+
+
+url = async_database_url()
+engine = create_async_engine(url, **async_engine_options(url))
+Session = async_sessionmaker(engine, expire_on_commit=False)
+
+
+def json_response(payload, status=200):
+    """Serialize with the app's JSON provider, so both serving modes return identical bodies"""
+    body = app.json.response(payload).get_data()
+    return Response(body, status_code=status, media_type="application/json")
+
+
+def error_response(e):
+    if isinstance(e, (BadRequest, NotFound)):
+        return json_response({"error": str(e)}, e.code)
+
+    app.logger.error(f"Error in async view: {str(e)}")
+    return json_response({"error": "Internal server error"}, 500)
+
+
+# asyncio counterparts of the per-worker slots of `app.utils.admission`
+_slots = {name: asyncio.Semaphore(limit) for name, limit in admission.concurrency.items() if limit > 0}
+
+
+def _reject(route_class, reason, status, retry_after, message):
+    admission.REJECTED.labels(route_class, reason).inc()
+    response = json_response({"error": message}, status)
+    response.headers["Retry-After"] = str(max(math.ceil(retry_after), 1))
+    return response
+
+
+def _client_id(request):
+    header = app.config["RATE_LIMIT_CLIENT_HEADER"]
+    if header and request.headers.get(header):
+        return request.headers[header].split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def admitted(view):
+    """
+    Apply the rate limit and concurrency limit of the view's route class
+    (looked up by the view's name, like the Flask endpoint it mirrors). The
+    slot of a streamed response is held until its body has been sent.
+    """
+    route_class = admission.route_classes.get(view.__name__, admission.DEFAULT_CLASS)
+
+    @functools.wraps(view)
+    async def wrapper(request):
+        if route_class in admission.rate_limits:
+            rate, burst = admission.rate_limits[route_class]
+            # the redis backend blocks, so take the token off the event loop
+            wait = await run_in_threadpool(
+                admission.buckets.take, (route_class, _client_id(request)), rate, burst)
+            if wait > 0:
+                return _reject(route_class, "rate_limit", 429, wait, "Too many requests")
+
+        slots = _slots.get(route_class)
+        if slots is None:
+            return await view(request)
+
+        try:
+            await asyncio.wait_for(slots.acquire(), app.config["ADMISSION_QUEUE_TIMEOUT"])
+        except asyncio.TimeoutError:
+            return _reject(route_class, "concurrency", 503, app.config["ADMISSION_RETRY_AFTER"],
+                           "Server busy, retry shortly")
+
+        try:
+            response = await view(request)
+        except BaseException:
+            slots.release()
+            raise
+
+        if isinstance(response, StreamingResponse):
+            body = response.body_iterator
+
+            async def release_when_sent():
+                try:
+                    async for chunk in body:
+                        yield chunk
+                finally:
+                    slots.release()
+
+            response.body_iterator = release_when_sent()
+        else:
+            slots.release()
+
+        return response
+
+    return wrapper
+
+
+async def keyset_page(session, query):
+    """Async counterpart of `app.utils.pagination.keyset_page` for a `list_query`"""
+    statement = seek(query.statement, query.key, query.after, query.sort, query.descending)
+    rows = (await session.execute(statement.limit(query.limit + 1))).all()
+
+    next_cursor = None
+    if len(rows) > query.limit:
+        rows = rows[:query.limit]
+        next_cursor = page_cursor(rows[-1], query.key, query.sort)
+
+    return rows, next_cursor
+
+
+def stream_ndjson(query):
+    """Async counterpart of `app.utils.pagination.stream_ndjson` for a `list_query`"""
+    statement = seek(query.statement, query.key, query.after, query.sort, query.descending)
+    statement = statement.execution_options(yield_per=STREAM_BATCH_SIZE)
+
+    async def generate():
+        async with Session() as session:
+            result = await session.stream(statement)
+            async for row in result:
+                yield app.json.dumps(row._asdict(), separators=(",", ":")) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+async def health(request):
+    return json_response({"status": "ok"})
+
+
+@admitted
+async def get_all_students(request):
+    try:
+        query = list_query(Student.id, STUDENT_FIELDS, STUDENT_SORTS, STUDENT_FILTERS,
+                           args=request.query_params)
+
+        if wants_stream(request.query_params):
+            return stream_ndjson(query)
+
+        async with Session() as session:
+            students, next_cursor = await keyset_page(session, query)
+
+        return json_response({
+            "students": [student._asdict() for student in students],
+            "limit": query.limit,
+            "next_cursor": next_cursor
+        })
+
+    except Exception as e:
+        return error_response(e)
+
+
+async def _student_with_courses(session, student_id, entity):
+    rows = (await session.execute(
+        select(entity, Course)
+        .outerjoin(Enrollment, Enrollment.student_id == Student.id)
+        .outerjoin(Course, Course.id == Enrollment.course_id)
+        .where(Student.id == student_id)
+    )).all()
+
+    if not rows:
+        raise NotFound("Student not found")
+
+    return rows
+
+
+@admitted
+async def get_student_by_id(request):
+    try:
+        async with Session() as session:
+            rows = await _student_with_courses(session, request.path_params["student_id"], Student)
+
+        return json_response(serialize_student(
+            rows[0].Student, courses=[row.Course for row in rows if row.Course is not None]))
+
+    except NotFound:
+        return json_response({"error": "Student not found"}, 404)
+    except Exception as e:
+        return error_response(e)
+
+
+@admitted
+async def get_student_courses(request):
+    try:
+        async with Session() as session:
+            rows = await _student_with_courses(session, request.path_params["student_id"], Student.id)
+
+        courses = [row.Course for row in rows if row.Course is not None]
+        if not courses:
+            return json_response({"message": "Student is not enrolled in any courses."})
+
+        return json_response([serialize_course(course) for course in courses])
+
+    except NotFound:
+        return json_response({"error": "Student not found"}, 404)
+    except Exception as e:
+        return error_response(e)
+
+
+@admitted
+async def get_all_courses(request):
+    try:
+        query = list_query(Course.id, COURSE_FIELDS, COURSE_SORTS, COURSE_FILTERS,
+                           args=request.query_params)
+
+        if wants_stream(request.query_params):
+            return stream_ndjson(query)
+
+        async with Session() as session:
+            courses, next_cursor = await keyset_page(session, query)
+
+        return json_response({
+            "courses": [course._asdict() for course in courses],
+            "limit": query.limit,
+            "next_cursor": next_cursor
+        })
+
+    except Exception as e:
+        return error_response(e)
+
+
+@admitted
+async def get_course_by_id(request):
+    try:
+        async with Session() as session:
+            course = await session.get(Course, request.path_params["course_id"])
+
+        if course is None:
+            return json_response({"error": "Course not found"}, 404)
+
+        return json_response(serialize_course(course))
+
+    except Exception as e:
+        return error_response(e)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(asgi_app):
+    yield
+    await engine.dispose()
+
+
+asgi_app = Starlette(
+    routes=[
+        Route("/health", health, methods=["GET"]),
+        Route("/api/v1.0/students/all", get_all_students, methods=["GET"]),
+        Route("/api/v1.0/students/{student_id:int}", get_student_by_id, methods=["GET"]),
+        Route("/api/v1.0/students/{student_id:int}/courses", get_student_courses, methods=["GET"]),
+        Route("/api/v1.0/courses/all", get_all_courses, methods=["GET"]),
+        Route("/api/v1.0/courses/{course_id:int}", get_course_by_id, methods=["GET"]),
+        # every other route and method is served by the Flask app
+        Mount("/", app=WSGIMiddleware(app)),
+    ],
+    # the async views answer cross-origin requests like Flask-CORS does for the Flask routes
+    middleware=[Middleware(CORSMiddleware, allow_origins=app.config["CORS_ORIGINS"],
+                           allow_methods=["*"], allow_headers=["*"])],
+    lifespan=lifespan,
+)
@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+import click
+
+from app import app
+from app.utils import change_feed, enrollment_counts, seed
+
+
+@app.cli.command("reconcile-enrollment-counts")
+def reconcile_enrollment_counts():
+    """Recompute Course/Student enrollment_count from the enrollments table."""
+    fixed = enrollment_counts.reconcile()
+    click.echo(f"Corrected {fixed['courses']} course(s) and {fixed['students']} student(s).")
+
+
+@app.cli.command("prune-tombstones")
+@click.option("--days", default=30, show_default=True, help="Keep tombstones of the last DAYS days.")
+def prune_tombstones(days):
+    """Delete change feed tombstones older than the sync window of every client."""
+    pruned = change_feed.prune(timedelta(days=days))
+    click.echo(f"Deleted {pruned} tombstone(s).")
+
+
+@app.cli.command("seed")
+@click.option("--students", default=1000, show_default=True, help="Students to generate.")
+@click.option("--courses", default=50, show_default=True, help="Courses to generate.")
+@click.option("--enrollments-per-student", default=3.0, show_default=True,
+              help="Mean number of courses each student takes.")
+@click.option("--random-seed", default=42, show_default=True, help="Same seed, same data.")
+@click.option("--reset", is_flag=True, help="Delete all students, courses and enrollments first.")
+def seed_database(students, courses, enrollments_per_student, random_seed, reset):
+    """Fill the database with synthetic students, courses and enrollments."""
+    if reset:
+        click.confirm("Delete every student, course and enrollment?", abort=True)
+        seed.clear()
+
+    added = seed.seed(students, courses, enrollments_per_student, random_seed)
+    click.echo(f"Added {added['students']} student(s), {added['courses']} course(s) "
+               f"and {added['enrollments']} enrollment(s).")
@@ -15,6 +15,7 @@ class Course(db.Model):
         title (str): Unique title of the course (e.g., "Introduction to Biology").
         code (str): Unique course code (e.g., "BIO101").
         description (str, optional): A brief description of the course content.
+        enrollment_count (int): Number of students enrolled in the course.
         created_at (datetime): Timestamp when the course was created.
         updated_at (datetime): Timestamp of the last update to the course.
 
@@ -25,23 +26,32 @@ class Course(db.Model):
         __repr__(): Returns a string representation of the Course object.
     """
     __tablename__ = "courses"
+    __table_args__ = (
+        # word search on MySQL (MATCH ... AGAINST), not created on other databases
+        db.Index('ft_courses_title_code', 'title', 'code',
+                 mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), unique=True, nullable=False)
     code = db.Column(db.String(10), unique=True, nullable=False)
     description = db.Column(db.Text, nullable=True)
+
+    # number of enrollments, maintained by every enrollment write (see app/utils/enrollment_counts.py)
+    enrollment_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
     
     # Relationship to Student through Enrollment
     students = db.relationship(
         'Enrollment',
         back_populates='course',
         cascade='all, delete-orphan',
+        passive_deletes=True, # left to ON DELETE CASCADE instead of loading every enrollment
         lazy="dynamic"
     )
     
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
-                                              onupdate=lambda: datetime.now(timezone.utc))
+                                              onupdate=lambda: datetime.now(timezone.utc), index=True)
     
 
     def __repr__(self) -> str:
@@ -23,9 +23,21 @@ class Enrollment(db.Model):
         course (Course): The course associated with this record.
     """
     __tablename__ = 'enrollments'
+    __table_args__ = (
+        # a student can enroll in a course only once; also serves lookups by student
+        db.Index('uq_enrollments_student_course', 'student_id', 'course_id', unique=True),
+        # lookups by course (students of a course)
+        db.Index('ix_enrollments_course_student', 'course_id', 'student_id'),
+        # change feed, in modification order
+        db.Index('ix_enrollments_updated_at', 'updated_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
-    course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), nullable=False)
+    # deleting a student or course deletes its enrollments in the database (ON DELETE CASCADE)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id', name='fk_enrollments_student_id_students',
+                                                     ondelete='CASCADE'), nullable=False)
+    course_id = db.Column(db.Integer, db.ForeignKey('courses.id', name='fk_enrollments_course_id_courses',
+                                                    ondelete='CASCADE'), nullable=False)
 
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
@@ -16,7 +16,8 @@ class Student(db.Model):
         full_name (str): Full name of the student.
         age (int): Age of the student.
         gender (Enum): Gender of the student; either "Male" or "Female".
-        email (str, optional): Email address of the student.
+        email (str, optional): Email address of the student (indexed).
+        enrollment_count (int): Number of courses the student is enrolled in.
         created_at (datetime): Timestamp of when the student record was created.
         updated_at (datetime): Timestamp of the last update to the student record.
 
@@ -27,22 +28,35 @@ class Student(db.Model):
         __repr__(): Returns a string representation of the Student object.
     """
     __tablename__ = "students"
+    __table_args__ = (
+        # prefix search on names (LIKE 'jo%'), sort=full_name
+        db.Index('ix_students_full_name', 'full_name'),
+        # gender filter with an age range
+        db.Index('ix_students_gender_age', 'gender', 'age'),
+        # word search on MySQL (MATCH ... AGAINST), not created on other databases
+        db.Index('ft_students_full_name_email', 'full_name', 'email',
+                 mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     full_name = db.Column(db.String(100), nullable=False)
-    age = db.Column(db.Integer, nullable=False)
+    age = db.Column(db.Integer, nullable=False, index=True)
     gender = db.Column(db.Enum("Male", "Female", name="gender_types"), nullable=False)
-    email = db.Column(db.String(255), nullable=True)
+    email = db.Column(db.String(255), nullable=True, index=True)
+
+    # number of enrollments, maintained by every enrollment write (see app/utils/enrollment_counts.py)
+    enrollment_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
-                                              onupdate=lambda: datetime.now(timezone.utc))
+                                              onupdate=lambda: datetime.now(timezone.utc), index=True)
     
     # Relationship to Course through Enrollment
     courses = db.relationship(
         'Enrollment',
         back_populates='student',
         cascade='all, delete-orphan',
+        passive_deletes=True, # left to ON DELETE CASCADE instead of loading every enrollment
         lazy="dynamic"
     )
 
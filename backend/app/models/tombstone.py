@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+
+from app import db
+
+
+class Tombstone(db.Model):
+    """
+    Records the deletion of a student, course or enrollment so the change
+    feed can report it after the row itself is gone.
+
+    Attributes:
+        id (int): Primary key of the tombstone.
+        entity (str): Table of the deleted row ("students", "courses" or "enrollments").
+        entity_id (int): Primary key the deleted row had.
+        deleted_at (datetime): Timestamp of the deletion.
+
+    Methods:
+        __repr__(): Returns a string representation of the Tombstone object.
+    """
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        # change feed of one entity, in deletion order
+        db.Index('ix_tombstones_entity_deleted_at', 'entity', 'deleted_at', 'entity_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self) -> str:
+        """Provides a friendly representation of the tombstone."""
+        return f"Tombstone(entity={self.entity!r}, entity_id={self.entity_id!r}, deleted_at={self.deleted_at!r})"
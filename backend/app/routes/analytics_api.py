@@ -0,0 +1,112 @@
+import math
+
+from flask import jsonify, request
+from werkzeug.exceptions import BadRequest
+
+from app import app
+from app.utils import analytics, replicas
+from app.utils.filters import parse_datetime
+
+
+def _report_response(report, remaining):
+    """The report, cacheable by clients until its time bucket ends"""
+    response = jsonify(report)
+    response.headers["Cache-Control"] = f"max-age={math.ceil(remaining)}"
+    return response
+
+
+def _get_int(name, default=None, minimum=1):
+    value = request.args.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer")
+    if value < minimum:
+        raise BadRequest(f"{name} must be at least {minimum}")
+    return value
+
+
+def _get_datetime(name):
+    value = request.args.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        # naive UTC, like the enrollment timestamps
+        return parse_datetime(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be an ISO 8601 date or datetime")
+
+
+@app.route("/api/v1.0/analytics/enrollments-per-course", methods=['GET'])
+@replicas.reads_from_replica
+def get_enrollments_per_course():
+    """
+    Number of students enrolled in each course
+    """
+    try:
+        report, remaining = analytics.cached_report(
+            "enrollments-per-course", {}, analytics.enrollments_per_course)
+        return _report_response(report, remaining), 200
+
+    except Exception as e:
+        app.logger.error(f"Error computing enrollments per course: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route("/api/v1.0/analytics/course-demographics", methods=['GET'])
+@replicas.reads_from_replica
+def get_course_demographics():
+    """
+    Gender and age distribution of each course's students (`age_band` years per band, default 5)
+    """
+    try:
+        age_band = _get_int("age_band", default=5)
+        report, remaining = analytics.cached_report(
+            "course-demographics", {"age_band": age_band},
+            lambda: analytics.course_demographics(age_band))
+        return _report_response(report, remaining), 200
+
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Error computing course demographics: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route("/api/v1.0/analytics/enrollment-growth", methods=['GET'])
+@replicas.reads_from_replica
+def get_enrollment_growth():
+    """
+    New and cumulative enrollments per `interval` (day, week, month, year),
+    optionally for one `course_id` and between `start` and `end`
+    """
+    try:
+        interval = request.args.get("interval", "month")
+        if interval not in analytics.GROWTH_INTERVALS:
+            raise BadRequest(f"interval must be one of {list(analytics.GROWTH_INTERVALS)}")
+
+        params = {
+            "interval": interval,
+            "course_id": _get_int("course_id"),
+            "start": _get_datetime("start"),
+            "end": _get_datetime("end"),
+        }
+        report, remaining = analytics.cached_report(
+            "enrollment-growth", params, lambda: analytics.enrollment_growth(**params))
+        return _report_response(report, remaining), 200
+
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Error computing enrollment growth: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route("/api/v1.0/analytics/cache-stats", methods=['GET'])
+def get_analytics_cache_stats():
+    """
+    Hit/miss counters of the analytics report cache of the worker serving the request
+    """
+    return jsonify(analytics.stats()), 200
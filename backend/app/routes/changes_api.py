@@ -0,0 +1,73 @@
+from flask import jsonify, request
+from werkzeug.exceptions import BadRequest, NotFound
+
+from app import app
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.student import Student
+from app.routes.course_api import COURSE_FIELDS
+from app.routes.student_api import STUDENT_FIELDS
+from app.utils import change_feed
+from app.utils.filters import parse_datetime
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+ENROLLMENT_FIELDS = {
+    "id": Enrollment.id,
+    "student_id": Enrollment.student_id,
+    "course_id": Enrollment.course_id,
+    "created_at": Enrollment.created_at,
+    "updated_at": Enrollment.updated_at,
+}
+
+# entities with a change feed: model and the columns returned for changed rows
+FEEDS = {
+    "students": (Student, list(STUDENT_FIELDS.values())),
+    "courses": (Course, list(COURSE_FIELDS.values())),
+    "enrollments": (Enrollment, list(ENROLLMENT_FIELDS.values())),
+}
+
+
+@app.route("/api/v1.0/changes/<entity>", methods=['GET'])
+def get_changes(entity):
+    """
+    Rows of `entity` (students, courses, enrollments) created, updated or deleted
+    after `updated_since` (ISO timestamp) or the `after` cursor of the previous page
+    """
+    try:
+        if entity not in FEEDS:
+            raise NotFound(f"No change feed for {entity!r}. Available: {list(FEEDS)}")
+        model, columns = FEEDS[entity]
+
+        try:
+            limit = int(request.args.get("limit", DEFAULT_PAGE_SIZE))
+        except ValueError:
+            raise BadRequest("limit must be an integer")
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise BadRequest(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+        position = None
+        if request.args.get("after"):
+            position = change_feed.decode_position(request.args["after"])
+        elif request.args.get("updated_since"):
+            try:
+                position = change_feed.start_position(parse_datetime(request.args["updated_since"]))
+            except ValueError:
+                raise BadRequest("updated_since must be an ISO 8601 date or datetime")
+
+        changes, position, has_more = change_feed.read_changes(entity, model, columns, position, limit)
+
+        return jsonify({
+            "changes": changes,
+            "limit": limit,
+            "next_cursor": change_feed.encode_position(position) if position else None,
+            "has_more": has_more
+        }), 200
+
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
+    except NotFound as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        app.logger.error(f"Error reading change feed: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
@@ -1,11 +1,72 @@
 from flask import jsonify, request
+from sqlalchemy import func, insert, or_, select, tuple_
+from sqlalchemy.exc import IntegrityError
 from werkzeug.exceptions import BadRequest, Conflict, NotFound
 
 from app import app, db
 from app.models.student import Student
 from app.models.course import Course
 from app.models.enrollment import Enrollment
+from app.utils import course_cache, deletion, enrollment_counts, replicas, response_cache
+from app.utils.bulk import batched, get_batch_size, read_ids, read_records
+from app.utils.filters import date_range, list_query
+from app.utils.pagination import keyset_page, stream_ndjson, wants_stream
+from app.utils.serializers import serialize_course, serialize_enrollment
+
+
+# columns that can be requested through `fields=` on the course list
+COURSE_FIELDS = {
+    "id": Course.id,
+    "title": Course.title,
+    "code": Course.code,
+    "description": Course.description,
+    "enrollment_count": Course.enrollment_count,
+    "created_at": Course.created_at,
+    "updated_at": Course.updated_at,
+}
+
+# `sort=` keys of the course list, each backed by an index
+COURSE_SORTS = {
+    "id": Course.id,
+    "title": Course.title,
+    "code": Course.code,
+    "created_at": Course.created_at,
+    "updated_at": Course.updated_at,
+}
+
+# query-string filters of the course list
+COURSE_FILTERS = {
+    **date_range(Course.created_at, "created"),
+    **date_range(Course.updated_at, "updated"),
+}
+
+
+def enrollment_error(pairs):
+    """
+    Why inserting enrollments of (student_id, course_id) pairs violated a
+    constraint, checked after the rollback.
+
+    Returns:
+        Conflict | NotFound | None: Conflict if one of the pairs is already
+        enrolled, NotFound if a student or course no longer exists, or None
+        for any other violation.
+    """
+    pairs = list(pairs)
+    if db.session.execute(
+            select(Enrollment.id)
+            .where(tuple_(Enrollment.student_id, Enrollment.course_id).in_(pairs))
+            .limit(1)).first():
+        return Conflict("Student is already enrolled in this course.")
+
+    student_ids = {student_id for student_id, _ in pairs}
+    if db.session.scalar(select(func.count(Student.id)).where(Student.id.in_(student_ids))) < len(student_ids):
+        return NotFound("Student not found")
+
+    course_ids = {course_id for _, course_id in pairs}
+    if db.session.scalar(select(func.count(Course.id)).where(Course.id.in_(course_ids))) < len(course_ids):
+        return NotFound("Course not found")
 
+    return None
 
 
 @app.route("/api/v1.0/course/create", methods=['POST'])
@@ -26,11 +87,11 @@ def create_course():
         
 
         # Check if course already exists
-        if Course.query.filter_by(title=data['title']).first():
+        if course_cache.get_course(title=data['title']):
             raise Conflict("Course already exits")
         
         # Check if course code already exists 
-        if Course.query.filter_by(code=data['code']).first():
+        if course_cache.get_course(code=data['code']):
             raise Conflict("Course Code already taken")
     
 
@@ -46,17 +107,10 @@ def create_course():
         # store in database
         db.session.add(new_course)
         db.session.commit()
+        course_cache.invalidate()
+        response_cache.invalidate("courses")
 
-        response = {
-            "id": new_course.id,
-            "title": new_course.title,
-            "code": new_course.code,
-            "description": new_course.description,
-            "created_at": new_course.created_at.isoformat(),
-            "updated_at": new_course.updated_at.isoformat(),
-        }
-
-        return jsonify(response), 201
+        return jsonify(serialize_course(new_course)), 201
 
     except BadRequest as e:
         return jsonify({"error": str(e)}), 400
@@ -67,29 +121,48 @@ def create_course():
         return jsonify({"error": "Internal server error"}), 500
     
 @app.route("/api/v1.0/courses/all", methods=['GET'])
+@replicas.reads_from_replica
+@response_cache.cached("courses")
 def get_all_courses():
     """
-    Get all courses
+    Get all courses, one keyset page at a time (`limit`, `after`),
+    or as a streamed NDJSON export with `stream=true`.
+    Filters: `created_after`, `created_before`, `updated_after`, `updated_before`.
+    `sort=title` (or `-title`) orders it, `fields=id,title,code` limits the selected columns.
     """
     try:
-        courses = Course.query.all()
-
-        response = [{
-            "id": course.id,
-            "title": course.title,
-            "code": course.code,
-            "description": course.description,
-            "created_at": course.created_at,
-            "updated_at": course.updated_at
-        } for course in courses]
+        query = list_query(Course.id, COURSE_FIELDS, COURSE_SORTS, COURSE_FILTERS)
+
+        if wants_stream():
+            return stream_ndjson(query.statement, Course.id, lambda row: row._asdict(), after=query.after,
+                                 sort=query.sort, descending=query.descending)
+
+        courses, next_cursor = keyset_page(query.statement, Course.id, query.limit, after=query.after,
+                                           sort=query.sort, descending=query.descending)
+
+        response = {
+            "courses": [course._asdict() for course in courses],
+            "limit": query.limit,
+            "next_cursor": next_cursor
+        }
         
         return jsonify(response), 200
     
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        app.logger.error(f"Error fetching students: {str(e)}")
+        app.logger.error(f"Error fetching courses: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
     
 
+@app.route("/api/v1.0/courses/cache-stats", methods=['GET'])
+def get_course_cache_stats():
+    """
+    Hit/miss counters of this worker's course catalogue cache
+    """
+    return jsonify(course_cache.stats()), 200
+
+
 @app.route("/api/v1.0/courses/<int:course_id>", methods=['PUT'])
 def update_course(course_id):
     """
@@ -102,12 +175,10 @@ def update_course(course_id):
         course = Course.query.get_or_404(course_id)
         data = request.get_json()
 
-        print(data["title"])
-
-        if Course.query.filter_by(title=data["title"]).first():
+        if course_cache.get_course(title=data["title"]):
             raise Conflict("Course already exits")
         
-        if Course.query.filter_by(code=data["code"]).first():
+        if course_cache.get_course(code=data["code"]):
             raise Conflict("Course Code already taken")
         
         if 'title' in data:
@@ -118,21 +189,20 @@ def update_course(course_id):
             course.description = data['description'].strip()
         
         db.session.commit()
+        course_cache.invalidate()
+        response_cache.invalidate("courses")
         
         return jsonify({
             "message": "Course updated successfully",
-            "course": {
-                "id": course.id,
-                "title": course.title,
-                "code": course.code,
-                "description": course.description
-            }
+            "course": serialize_course(course)
         }), 200
     
     except BadRequest as e:
         return jsonify({"error": str(e)}), 400
     except NotFound:
         return jsonify({"error": "Course not found"}), 404
+    except Conflict as e:
+        return jsonify({"error": str(e)}), 409
     except Exception as e:
         db.session.rollback()
         app.logger.error(f"Error updating course: {str(e)}")
@@ -144,10 +214,12 @@ def delete_course(course_id):
     Delete a course
     """
     try:
-        course = Course.query.get_or_404(course_id)
-        
-        db.session.delete(course)
+        if not deletion.delete_by_ids(Course, [course_id]):
+            raise NotFound("Course not found")
+
         db.session.commit()
+        course_cache.invalidate()
+        response_cache.invalidate("courses", "students")
         
         return jsonify({
             "message": "Course deleted successfully",
@@ -161,25 +233,49 @@ def delete_course(course_id):
         app.logger.error(f"Error deleting course: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
+@app.route("/api/v1.0/courses/bulk-delete", methods=['POST'])
+def bulk_delete_courses():
+    """
+    Retire many courses (`{"ids": [...]}`) and their enrollments in one transaction,
+    `batch_size` ids per statement
+    """
+    try:
+        ids = read_ids()
+        batch_size = get_batch_size()
+
+        deleted = []
+        for batch in batched(ids, batch_size):
+            deleted.extend(deletion.delete_by_ids(Course, batch))
+
+        db.session.commit()
+        course_cache.invalidate()
+        response_cache.invalidate("courses", "students")
+
+        missing = set(ids) - set(deleted)
+        return jsonify({
+            "deleted": len(deleted),
+            "not_found": [course_id for course_id in ids if course_id in missing]
+        }), 200
+
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error deleting courses: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @app.route("/api/v1.0/courses/<int:course_id>", methods=['GET'])
+@replicas.reads_from_replica
+@response_cache.cached("courses")
 def get_course_by_id(course_id):
     """
     Get a specific course by ID
     """
     try:
+        # read from the database rather than the catalogue cache: enrollment_count changes with every enrollment
         course = Course.query.get_or_404(course_id)
         
-        response = {
-            "id": course.id,
-            "title": course.title,
-            "code": course.code,
-            "description": course.description,
-            "created_at": course.created_at,
-            "updated_at": course.updated_at
-
-        }
-        
-        return jsonify(response), 200
+        return jsonify(serialize_course(course)), 200
     
     except NotFound:
         return jsonify({"error": "Course not found"}), 404
@@ -204,7 +300,7 @@ def add_course_to_student(user_id:int):
             raise BadRequest(f"Missing required fields. Required: {required_fields}")
         
         # Check if course exists
-        course = Course.query.filter_by(title=data["title"]).first()
+        course = course_cache.get_course(title=data["title"])
         if not course:
             raise NotFound("Course not found")
         
@@ -213,27 +309,26 @@ def add_course_to_student(user_id:int):
         if not student:
             raise NotFound("Student not found")
         
-        # Check if the student is already enrolled in this course
-        existing_enrollment = Enrollment.query.filter_by(
-            student_id=user_id,
-            course_id=course.id
-        ).first()
-
-        if existing_enrollment:
-            raise Conflict("Student is already enrolled in this course.")
-
-        # Enroll student in the course
-        enrollment = Enrollment(student_id=user_id, course_id=course.id)
+        # Enroll student in the course; the unique (student_id, course_id)
+        # index rejects an existing enrollment, even under concurrent requests,
+        # and the foreign keys a student or course deleted meanwhile
+        enrollment = Enrollment(student_id=user_id, course_id=course["id"])
         db.session.add(enrollment)
+        try:
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            error = enrollment_error([(user_id, course["id"])])
+            if error is None:
+                raise
+            raise error
+
+        # counters commit in the same transaction as the enrollment
+        enrollment_counts.add_enrollments([(user_id, course["id"])])
         db.session.commit()
+        response_cache.invalidate("students", "courses")
 
-        return jsonify({
-            "id": enrollment.id,
-            "student_id": enrollment.student_id,
-            "course_id": enrollment.course_id,
-            "created_at": enrollment.created_at.isoformat(),
-            "updated_at": enrollment.updated_at.isoformat()
-        }), 201
+        return jsonify(serialize_enrollment(enrollment)), 201
 
     except (BadRequest, NotFound, Conflict) as e:
         return jsonify({"error": str(e)}), e.code
@@ -243,34 +338,151 @@ def add_course_to_student(user_id:int):
         return jsonify({"error": "Internal server error"}), 500
 
 
+@app.route("/api/v1.0/course/add/bulk", methods=['POST'])
+def bulk_add_courses_to_students():
+    """
+    Enroll many students in one request.
+
+    Takes a JSON array (or NDJSON/CSV upload) of rows with a `student_id` and
+    a course `code` or `title`. Courses, students and existing enrollments are
+    resolved with one IN query each per batch and new enrollments are inserted
+    in bulk inside a single transaction. Returns a per-row report.
+    """
+    try:
+        records = read_records()
+        batch_size = get_batch_size()
+
+        results = []
+        seen = set()
+        inserted = []
+
+        for batch in batched(enumerate(records, start=1), batch_size):
+            rows = []
+            for row, data in batch:
+                if not isinstance(data, dict) or 'student_id' not in data \
+                        or not ('code' in data or 'title' in data):
+                    results.append({"row": row, "status": "error",
+                                    "error": "Missing required fields. Required: ['student_id', 'code' or 'title']"})
+                    continue
+                try:
+                    student_id = int(data['student_id'])
+                except (TypeError, ValueError):
+                    results.append({"row": row, "status": "error", "error": "student_id must be an integer"})
+                    continue
+                rows.append((row, student_id, data))
+
+            # resolve every course and student of the batch at once
+            codes = {str(data['code']).upper().strip() for _, _, data in rows if 'code' in data}
+            titles = {data['title'] for _, _, data in rows if 'code' not in data}
+            courses = db.session.execute(
+                select(Course.id, Course.code, Course.title)
+                .where(or_(Course.code.in_(codes), Course.title.in_(titles)))
+            ).all() if codes or titles else []
+            course_by_code = {course.code: course.id for course in courses}
+            course_by_title = {course.title: course.id for course in courses}
+
+            student_ids = {student_id for _, student_id, _ in rows}
+            students = set(db.session.scalars(
+                select(Student.id).where(Student.id.in_(student_ids))
+            )) if student_ids else set()
+
+            pairs = []
+            for row, student_id, data in rows:
+                if 'code' in data:
+                    course_id = course_by_code.get(str(data['code']).upper().strip())
+                else:
+                    course_id = course_by_title.get(data['title'])
+
+                if course_id is None:
+                    results.append({"row": row, "status": "error", "error": "Course not found"})
+                elif student_id not in students:
+                    results.append({"row": row, "status": "error", "error": "Student not found"})
+                elif (student_id, course_id) in seen:
+                    results.append({"row": row, "status": "error", "error": "Duplicate enrollment in request"})
+                else:
+                    seen.add((student_id, course_id))
+                    pairs.append((row, student_id, course_id))
+
+            # detect existing enrollments in one query
+            existing = set(db.session.execute(
+                select(Enrollment.student_id, Enrollment.course_id)
+                .where(tuple_(Enrollment.student_id, Enrollment.course_id).in_(
+                    [(student_id, course_id) for _, student_id, course_id in pairs]))
+            ).tuples()) if pairs else set()
+
+            new_enrollments = []
+            for row, student_id, course_id in pairs:
+                if (student_id, course_id) in existing:
+                    results.append({"row": row, "status": "error",
+                                    "error": "Student is already enrolled in this course."})
+                else:
+                    new_enrollments.append({"student_id": student_id, "course_id": course_id})
+                    results.append({"row": row, "status": "created",
+                                    "student_id": student_id, "course_id": course_id})
+
+            if new_enrollments:
+                inserted.extend((row["student_id"], row["course_id"]) for row in new_enrollments)
+                db.session.execute(insert(Enrollment), new_enrollments)
+                enrollment_counts.add_enrollments(
+                    (row["student_id"], row["course_id"]) for row in new_enrollments)
+
+        # all batches are committed in one transaction
+        db.session.commit()
+        response_cache.invalidate("students", "courses")
+
+        results.sort(key=lambda result: result["row"])
+        created = sum(result["status"] == "created" for result in results)
+
+        return jsonify({
+            "created": created,
+            "failed": len(results) - created,
+            "results": results
+        }), 200
+
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
+    except IntegrityError as e:
+        # a concurrent request enrolled one of the pairs first, or deleted one
+        # of the students or courses
+        db.session.rollback()
+        error = enrollment_error(inserted)
+        if error is None:
+            app.logger.error(f"Error adding courses to students: {e}")
+            return jsonify({"error": "Internal server error"}), 500
+        return jsonify({"error": f"Enrollments changed during the request ({error.description.rstrip('.')}), "
+                                 "nothing was saved. Retry the request."}), error.code
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error adding courses to students: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
 @app.route("/api/v1.0/students/<int:student_id>/courses", methods=['GET'])
+@replicas.reads_from_replica
+@response_cache.cached("students", "courses")
 def get_student_courses(student_id):
     """
     Get all courses for a specific student
     """
     try:
-        student = Student.query.get_or_404(student_id)
+        # Fetch the student and all associated courses via Enrollment in one query
+        rows = db.session.execute(
+            select(Student.id, Course)
+            .outerjoin(Enrollment, Enrollment.student_id == Student.id)
+            .outerjoin(Course, Course.id == Enrollment.course_id)
+            .where(Student.id == student_id)
+        ).all()
+
+        if not rows:
+            raise NotFound("Student not found")
 
-        # Fetch all associated courses via Enrollment
-        student_courses = Enrollment.query.filter_by(student_id=student.id).all()
+        student_courses = [row.Course for row in rows if row.Course is not None]
 
         if not student_courses:
             return jsonify({"message": "Student is not enrolled in any courses."}), 200
 
-        
-        response = []
-        for sc in student_courses:
-            course = sc.course
-            response.append({
-                "id": course.id,
-                "title": course.title,
-                "code": course.code,
-                "description": course.description,
-                "created_at": course.created_at.isoformat() if course.created_at else None,
-                "updated_at": course.updated_at.isoformat() if course.updated_at else None
-            })
 
-        return jsonify(response), 200
+        return jsonify([serialize_course(course) for course in student_courses]), 200
 
     except NotFound:
         return jsonify({"error": "Student not found"}), 404
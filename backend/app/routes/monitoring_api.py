@@ -0,0 +1,74 @@
+from flask import Response, jsonify
+
+from app import app, db
+from app.utils import admission, replicas
+from app.utils.db_pool import pool_stats
+from app.utils.health import readiness
+from app.utils.metrics import render_metrics
+
+
+@app.route("/health", methods=['GET'])
+def health():
+    """
+    Liveness probe: the worker is up and serving requests. Never touches the database.
+    """
+    return jsonify({"status": "ok"}), 200
+
+
+@app.route("/ready", methods=['GET'])
+def ready():
+    """
+    Readiness probe: database reachable and schema at the migration head.
+    Served from a short-lived cached probe result (READINESS_CACHE_TTL).
+    """
+    result = readiness()
+    return jsonify(result), 200 if result["ready"] else 503
+
+
+@app.route("/metrics", methods=['GET'])
+def metrics():
+    """
+    Prometheus scrape endpoint
+    """
+    payload, content_type = render_metrics()
+    return Response(payload, content_type=content_type)
+
+
+
+@app.route("/api/v1.0/db/pool-stats", methods=['GET'])
+def get_pool_stats():
+    """
+    Live connection pool metrics of the worker serving the request
+    """
+    try:
+        return jsonify(pool_stats(db.engine)), 200
+
+    except Exception as e:
+        app.logger.error(f"Error reading pool stats: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route("/api/v1.0/db/replicas", methods=['GET'])
+def get_replica_status():
+    """
+    Read replicas in rotation, the ones left out after a failure, and their pools in this worker
+    """
+    try:
+        return jsonify(replicas.status()), 200
+
+    except Exception as e:
+        app.logger.error(f"Error reading replica status: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route("/api/v1.0/admission/stats", methods=['GET'])
+def get_admission_stats():
+    """
+    Concurrency and rate limits of each route class, and its requests in flight in this worker
+    """
+    try:
+        return jsonify(admission.stats()), 200
+
+    except Exception as e:
+        app.logger.error(f"Error reading admission stats: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
@@ -0,0 +1,39 @@
+from flask import jsonify, request
+from werkzeug.exceptions import BadRequest
+
+from app import app
+from app.utils import replicas, response_cache, search
+
+
+@app.route("/api/v1.0/search", methods=['GET'])
+@replicas.reads_from_replica
+@response_cache.cached("students", "courses")
+def search_all():
+    """
+    Ranked search of students (name, email) and courses (title, code).
+    `type` restricts it to `students` or `courses`; `limit` and `offset` paginate each list.
+    """
+    try:
+        query, terms, limit, offset = search.get_search_args()
+
+        target = request.args.get("type", "all")
+        if target == "all":
+            targets = list(search.TARGETS)
+        elif target in search.TARGETS:
+            targets = [target]
+        else:
+            raise BadRequest(f"type must be one of {['all', *search.TARGETS]}")
+
+        response = {"query": query, "limit": limit, "offset": offset}
+        for name in targets:
+            results, next_offset = search.search(name, query, terms, limit, offset)
+            response[name] = results
+            response[f"{name}_next_offset"] = next_offset
+
+        return jsonify(response), 200
+
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Error searching: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
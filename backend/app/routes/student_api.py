@@ -1,10 +1,111 @@
+import operator
+from collections import defaultdict
+
 from flask import jsonify, request
+from sqlalchemy import func, insert, select
 from werkzeug.exceptions import BadRequest, Conflict, NotFound
 
 from app import app, db
 from app.models.student import Student
 from app.models.course import Course
 from app.models.enrollment import Enrollment
+from app.utils import course_cache, deletion, replicas, response_cache
+from app.utils.bulk import batched, get_batch_size, read_ids, read_records
+from app.utils.filters import date_range, email_domain, list_query
+from app.utils.pagination import get_page_args, keyset_page, stream_ndjson, wants_stream
+from app.utils.serializers import serialize_student
+
+
+# range of the INTEGER age column
+INT_MIN, INT_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+def parse_gender(value):
+    gender = value.title()
+    if gender not in ("Male", "Female"):
+        raise ValueError("must be Male or Female")
+    return gender
+
+
+# columns that can be requested through `fields=` on the student list
+STUDENT_FIELDS = {
+    "id": Student.id,
+    "full_name": Student.full_name,
+    "age": Student.age,
+    "email": Student.email,
+    "gender": Student.gender,
+    "enrollment_count": Student.enrollment_count,
+    "created_at": Student.created_at,
+    "updated_at": Student.updated_at,
+}
+
+# `sort=` keys of the student list, each backed by an index
+STUDENT_SORTS = {
+    "id": Student.id,
+    "full_name": Student.full_name,
+    "age": Student.age,
+    "created_at": Student.created_at,
+    "updated_at": Student.updated_at,
+}
+
+# query-string filters of the student list
+STUDENT_FILTERS = {
+    "age_min": (Student.age, operator.ge, int),
+    "age_max": (Student.age, operator.le, int),
+    "gender": (Student.gender, operator.eq, parse_gender),
+    "email_domain": (Student.email, email_domain, str),
+    **date_range(Student.created_at, "created"),
+    **date_range(Student.updated_at, "updated"),
+}
+
+
+def validate_student(data):
+    """
+    Validate a new student's fields and normalize them for storage.
+
+    Raises:
+        BadRequest: if a required field is missing or invalid.
+
+    Returns:
+        dict: the column values of the new student.
+    """
+    if not isinstance(data, dict):
+        raise BadRequest("Student must be a JSON object")
+
+    # Validate all required fields
+    required_fields = ['full_name', 'age', 'gender']
+    if not all(field in data for field in required_fields):
+        raise BadRequest(f"Missing required fields. Required: {required_fields}")
+    
+    # Validate gender 
+    gender = str(data['gender']).strip().title()
+    if gender not in ["Male", "Female"]:
+        raise BadRequest("Gender must be Male or Female")
+
+    try:
+        age = int(data['age'])
+    except (TypeError, ValueError):
+        raise BadRequest("Age must be an integer")
+
+    # the database would reject these; bulk imports must report them per row instead
+    if not INT_MIN <= age <= INT_MAX:
+        raise BadRequest("Age is out of range")
+
+    email = data.get('email')
+    fields = {
+        "full_name": str(data["full_name"]).title().strip(),
+        "age": age,
+        "email": str(email).title().strip() if email else None,
+        "gender": gender,
+    }
+
+    for name in ("full_name", "email"):
+        max_length = Student.__table__.c[name].type.length
+        if fields[name] is not None and len(fields[name]) > max_length:
+            raise BadRequest(f"{name} must be at most {max_length} characters")
+
+    return fields
+
 
 @app.route("/")
 def hello_world():
@@ -22,41 +123,23 @@ def create_user():
         # collect all user request
         data = request.get_json()
 
-        # Validate all required fields
-        required_fields = ['full_name', 'age', 'gender']
-        if not all(field in data for field in required_fields):
-            raise BadRequest(f"Missing required fields. Required: {required_fields}")
+        # Validate and normalize all fields
+        fields = validate_student(data)
         
         # Check if email already exists
-        if Student.query.filter_by(email=data['email']).first():
+        if fields["email"] and Student.query.filter_by(email=fields["email"]).first():
             raise Conflict("Email address already in use")
-        
-        # Validate gender 
-        if data['gender'].title() not in ["Male", "Female"]:
-            raise BadRequest("Gender must be Male or Female")
     
         # serialization
-        new_student = Student(full_name = data["full_name"].title().strip(),
-                        age = data["age"],
-                        email = data["email"].title().strip(),
-                        gender = data["gender"].title().strip())
+        new_student = Student(**fields)
         
     
         # store in database
         db.session.add(new_student)
         db.session.commit()
+        response_cache.invalidate("students")
 
-        response = {
-            "id": new_student.id,
-            "full_name": new_student.full_name,
-            "age": new_student.age,
-            "email": new_student.email,
-            "gender": new_student.gender,
-            "created_at": new_student.created_at.isoformat(),
-            "updated_at": new_student.updated_at.isoformat(),
-        }
-
-        return jsonify(response), 201
+        return jsonify(serialize_student(new_student)), 201
 
     except BadRequest as e:
         return jsonify({"error": str(e)}), 400
@@ -67,27 +150,109 @@ def create_user():
         return jsonify({"error": "Internal server error"}), 500
     
 
+@app.route("/api/v1.0/students/bulk", methods=['POST'])
+def bulk_create_students():
+    """
+    Create many students from a JSON array, NDJSON or CSV upload.
+
+    Rows are validated like `create_user`, checked for duplicate emails with
+    one query per batch, and inserted `batch_size` rows per statement.
+    Returns a per-row report.
+    """
+    try:
+        records = read_records()
+        batch_size = get_batch_size()
+
+        results = []
+        seen_emails = set()
+
+        for batch in batched(enumerate(records, start=1), batch_size):
+            valid = []
+            for row, data in batch:
+                try:
+                    fields = validate_student(data)
+                except BadRequest as e:
+                    results.append({"row": row, "status": "error", "error": e.description})
+                    continue
+
+                if fields["email"] and fields["email"] in seen_emails:
+                    results.append({"row": row, "status": "error",
+                                    "error": "Duplicate email in upload"})
+                    continue
+
+                seen_emails.add(fields["email"])
+                valid.append((row, fields))
+
+            # one set-based duplicate check for the whole batch
+            emails = [fields["email"] for _, fields in valid if fields["email"]]
+            existing = set(db.session.scalars(
+                select(Student.email).where(Student.email.in_(emails))
+            )) if emails else set()
+
+            new_rows = []
+            for row, fields in valid:
+                if fields["email"] in existing:
+                    results.append({"row": row, "status": "error",
+                                    "error": "Email address already in use"})
+                else:
+                    new_rows.append((row, fields))
+
+            if new_rows:
+                # executemany INSERT
+                db.session.execute(insert(Student), [fields for _, fields in new_rows])
+                db.session.commit()
+                response_cache.invalidate("students")
+                results.extend({"row": row, "status": "created", "email": fields["email"]}
+                               for row, fields in new_rows)
+
+        results.sort(key=lambda result: result["row"])
+        created = sum(result["status"] == "created" for result in results)
+
+        return jsonify({
+            "created": created,
+            "failed": len(results) - created,
+            "results": results
+        }), 200
+
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error importing students: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+    
+
 @app.route("/api/v1.0/students/all", methods=['GET'])
+@replicas.reads_from_replica
+@response_cache.cached("students")
 def get_all_students():
     """
-    Get all students
+    Get all students, one keyset page at a time (`limit`, `after`),
+    or as a streamed NDJSON export with `stream=true`.
+    Filters: `age_min`, `age_max`, `gender`, `email_domain`, `created_after`,
+    `created_before`, `updated_after`, `updated_before`.
+    `sort=created_at` (or `-created_at`) orders it, `fields=id,full_name` limits the selected columns.
     """
     try:
-        students = Student.query.all()
+        query = list_query(Student.id, STUDENT_FIELDS, STUDENT_SORTS, STUDENT_FILTERS)
 
-    
-        response = [{
-            "id": student.id,
-            "full_name": student.full_name,
-            "age": student.age,
-            "email": student.email,
-            "gender": student.gender,
-            "created_at": student.created_at,
-            "updated_at": student.updated_at
-        } for student in students]
+        if wants_stream():
+            return stream_ndjson(query.statement, Student.id, lambda row: row._asdict(), after=query.after,
+                                 sort=query.sort, descending=query.descending)
+
+        students, next_cursor = keyset_page(query.statement, Student.id, query.limit, after=query.after,
+                                            sort=query.sort, descending=query.descending)
+
+        response = {
+            "students": [student._asdict() for student in students],
+            "limit": query.limit,
+            "next_cursor": next_cursor
+        }
         
         return jsonify(response), 200
     
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         app.logger.error(f"Error fetching students: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -120,14 +285,11 @@ def update_student(student_id):
             student.gender = data['gender']
         
         db.session.commit()
+        response_cache.invalidate("students")
         
         return jsonify({
             "message": "Student updated successfully",
-            "student": {
-                "id": student.id,
-                "full_name": student.full_name,
-                "email": student.email
-            }
+            "student": serialize_student(student)
         }), 200
     
     except BadRequest as e:
@@ -148,10 +310,11 @@ def delete_student(student_id):
     Delete a student and their courses (cascade)
     """
     try:
-        student = Student.query.get_or_404(student_id)
-        
-        db.session.delete(student)
+        if not deletion.delete_by_ids(Student, [student_id]):
+            raise NotFound("Student not found")
+
         db.session.commit()
+        response_cache.invalidate("students", "courses")
         
         return jsonify({
             "message": "Student and associated courses deleted successfully",
@@ -165,28 +328,58 @@ def delete_student(student_id):
         app.logger.error(f"Error deleting student: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
+@app.route("/api/v1.0/students/bulk-delete", methods=['POST'])
+def bulk_delete_students():
+    """
+    Delete many students (`{"ids": [...]}`) and their enrollments in one transaction,
+    `batch_size` ids per statement
+    """
+    try:
+        ids = read_ids()
+        batch_size = get_batch_size()
+
+        deleted = []
+        for batch in batched(ids, batch_size):
+            deleted.extend(deletion.delete_by_ids(Student, batch))
+
+        db.session.commit()
+        response_cache.invalidate("students", "courses")
+
+        missing = set(ids) - set(deleted)
+        return jsonify({
+            "deleted": len(deleted),
+            "not_found": [student_id for student_id in ids if student_id in missing]
+        }), 200
+
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error deleting students: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
 @app.route("/api/v1.0/students/<int:student_id>", methods=['GET'])
+@replicas.reads_from_replica
+@response_cache.cached("students", "courses")
 def get_student_by_id(student_id):
     """
     Get a specific student by ID
     """
     try:
-        student = Student.query.get_or_404(student_id)
-        
-        response = {
-            "id": student.id,
-            "full_name": student.full_name,
-            "age": student.age,
-            "email": student.email,
-            "gender": student.gender,
-            "courses": [{
-                "id": course.id,
-                "title": course.title,
-                "created_at": course.created_at.isoformat()
-            } for course in student.courses],
-            "created_at": student.created_at,
-            "updated_at": student.updated_at
-        }
+        # student and their courses in one round trip
+        rows = db.session.execute(
+            select(Student, Course)
+            .outerjoin(Enrollment, Enrollment.student_id == Student.id)
+            .outerjoin(Course, Course.id == Enrollment.course_id)
+            .where(Student.id == student_id)
+        ).all()
+
+        if not rows:
+            raise NotFound("Student not found")
+
+        response = serialize_student(rows[0].Student,
+                                     courses=[row.Course for row in rows if row.Course is not None])
         
         return jsonify(response), 200
     
@@ -198,43 +391,71 @@ def get_student_by_id(student_id):
     
 
 @app.route("/api/v1.0/students/by-course", methods=['GET'])
+@replicas.reads_from_replica
+@response_cache.cached("students", "courses")
 def get_students_by_course():
     """
-    Find students taking specific courses
+    Find students taking specific courses, one keyset page at a time
+    (`limit`, `after`), or only their number with `count=true`
     """
     try:
         if 'course_titles' not in request.args:
             raise BadRequest("course_title parameter is required")
         
         course_titles = [title.strip() for title in request.args['course_titles'].split(',')]
+        limit, after = get_page_args()
 
-        # Check if courses exists
-        for course_title in course_titles:
-            course = Course.query.filter_by(title=course_title).first()
-            if not course:
-                raise NotFound("Course not found")
-        
-        # join Student and Enrollment to filter out where records matches selected course title
-        students = Student.query.join(Enrollment).filter(
-            Course.title.in_(course_titles)
-        ).distinct().all()
+        # Check if courses exists, uncached titles in one query
+        courses = course_cache.get_courses_by_title(course_titles)
+        missing = set(course_titles) - set(courses)
+        if missing:
+            raise NotFound(f"Course not found: {sorted(missing)}")
         
-        response = [{
-            "id": student.id,
-            "full_name": student.full_name,
-            "email": student.email,
-            "matching_courses": [course.title for course in student.courses 
-                               if course.title in course_titles]
-        } for student in students]
-
-        if len(response) < 1:
-            response = f"No Students Matches to {course_titles}"
+        course_ids = [course["id"] for course in courses.values()]
+
+        if request.args.get("count", "").lower() in ("1", "true", "yes"):
+            count = db.session.scalar(
+                select(func.count(func.distinct(Enrollment.student_id)))
+                .where(Enrollment.course_id.in_(course_ids))
+            )
+            return jsonify({"course_titles": course_titles, "count": count}), 200
+
+        # one row per student taking any of the courses
+        statement = (
+            select(Student.id, Student.full_name, Student.email)
+            .where(Student.id.in_(
+                select(Enrollment.student_id).where(Enrollment.course_id.in_(course_ids))))
+        )
+        students, next_cursor = keyset_page(statement, Student.id, limit, after=after)
+
+        # the page's matching enrollments in one IN query; titles come from the lookup above,
+        # so nothing is aggregated into a string that GROUP_CONCAT could truncate
+        title_by_id = {course["id"]: course["title"] for course in courses.values()}
+        matching_courses = defaultdict(list)
+        if students:
+            for student_id, course_id in db.session.execute(
+                    select(Enrollment.student_id, Enrollment.course_id)
+                    .where(Enrollment.student_id.in_([student.id for student in students]),
+                           Enrollment.course_id.in_(course_ids))):
+                matching_courses[student_id].append(title_by_id[course_id])
+
+        response = {
+            "students": [{
+                "id": student.id,
+                "full_name": student.full_name,
+                "email": student.email,
+                "matching_courses": sorted(matching_courses[student.id])
+            } for student in students],
+            "limit": limit,
+            "next_cursor": next_cursor
+        }
         
         return jsonify(response), 200
     
     except BadRequest as e:
         return jsonify({"error": str(e)}), 400
+    except NotFound as e:
+        return jsonify({"error": str(e)}), 404
     except Exception as e:
         app.logger.error(f"Error fetching students by course: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
-
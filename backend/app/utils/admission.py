@@ -0,0 +1,275 @@
+"""
+Admission control for expensive endpoints.
+
+Every route belongs to a class: "expensive" list and search reads,
+"analytics" reports, "bulk" writes, or "default" for everything else.
+Health, readiness and metrics endpoints are never limited. Classes are
+limited in two ways, both configured per class:
+
+- ADMISSION_CONCURRENCY caps the requests of a class in flight in one
+  worker. A request that finds no free slot within ADMISSION_QUEUE_TIMEOUT
+  seconds gets a 503, so cheap lookups never queue behind a burst of
+  expensive ones. Under gthread workers the limited classes also share
+  WORKER_THREADS - 1 slots, so one thread always stays free for other routes.
+- RATE_LIMITS gives each client a token bucket per class
+  (`class=RATE:BURST`, requests per second and bucket size). A client that
+  runs out gets a 429. Buckets live in the worker (RATE_LIMIT_BACKEND=local)
+  or in Redis (`redis`) so that every worker shares them.
+
+Both rejections carry a Retry-After header. ADMISSION_ROUTES moves
+individual endpoints to another class (`get_all_courses=expensive`).
+"""
+import math
+import threading
+import time
+
+from flask import g, jsonify, request
+from prometheus_client import Counter
+
+from app import app
+from app.utils.cache import LRUCache
+
+
+DEFAULT_CLASS = "default"
+
+# route class of each view; views not listed are in DEFAULT_CLASS
+ROUTE_CLASSES = {
+    "get_all_students": "expensive",
+    "get_students_by_course": "expensive",
+    "search_all": "expensive",
+    "get_changes": "expensive",
+    "get_enrollments_per_course": "analytics",
+    "get_course_demographics": "analytics",
+    "get_enrollment_growth": "analytics",
+    "bulk_create_students": "bulk",
+    "bulk_add_courses_to_students": "bulk",
+    "bulk_delete_students": "bulk",
+    "bulk_delete_courses": "bulk",
+}
+
+# probes and scrapes must answer even when the API is saturated
+EXEMPT = {"health", "ready", "metrics", "static"}
+
+REJECTED = Counter(
+    "flask_http_requests_rejected_total", "Requests refused by admission control",
+    ["route_class", "reason"])
+
+
+def parse_settings(value, convert):
+    """Parse "name=value,name=value" settings, e.g. ADMISSION_CONCURRENCY"""
+    settings = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, setting = item.partition("=")
+        settings[name.strip()] = convert(setting.strip())
+    return settings
+
+
+def parse_rate(value):
+    """"RATE:BURST" -> (requests per second, bucket size); BURST defaults to RATE"""
+    rate, _, burst = value.partition(":")
+    return float(rate), float(burst or rate)
+
+
+class LocalBuckets:
+    """Token buckets in this worker; clients idle long enough to refill completely are forgotten."""
+
+    def __init__(self, maxsize=100000):
+        self.buckets = LRUCache(maxsize=maxsize, ttl=0)
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        """Take one token; returns 0 if granted, else the seconds until one is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self.buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self.buckets.set(key, (tokens, now), ttl=(burst - tokens) / rate + 1)
+        return wait
+
+
+class RedisBuckets:
+    """
+    Token buckets shared by every worker, on Redis or any server speaking its
+    protocol. Requires the optional `redis` package. If the server cannot be
+    reached, requests are let through rather than failing.
+    """
+
+    # refill and take in one atomic step, on the server's clock
+    SCRIPT = """
+    local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = math.min(burst, (tonumber(state[1]) or burst) + (now - (tonumber(state[2]) or now)) * rate)
+    local wait = 0
+    if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+    return tostring(wait)
+    """
+
+    def __init__(self, url, prefix="rate-limit"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the redis package")
+
+        self.client = redis.Redis.from_url(url)
+        self.take_token = self.client.register_script(self.SCRIPT)
+        self.prefix = prefix
+        self.errors = redis.RedisError
+
+    def take(self, key, rate, burst):
+        try:
+            return float(self.take_token(keys=[f"{self.prefix}:{':'.join(key)}"], args=[rate, burst]))
+        except self.errors as e:
+            app.logger.warning(f"Rate limit backend unavailable, admitting request: {str(e)}")
+            return 0.0
+
+
+class NullBuckets:
+    """Disables rate limiting."""
+
+    def take(self, key, rate, burst):
+        return 0.0
+
+
+def create_buckets(config):
+    """Build the token bucket store selected by RATE_LIMIT_BACKEND (local, redis or none)"""
+    name = config["RATE_LIMIT_BACKEND"]
+
+    if name == "local":
+        return LocalBuckets()
+    if name == "redis":
+        return RedisBuckets(config["RATE_LIMIT_URL"])
+    if name == "none":
+        return NullBuckets()
+
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND {name!r}")
+
+
+route_classes = {**ROUTE_CLASSES, **parse_settings(app.config["ADMISSION_ROUTES"], str)}
+concurrency = parse_settings(app.config["ADMISSION_CONCURRENCY"], int)
+rate_limits = parse_settings(app.config["RATE_LIMITS"], parse_rate)
+buckets = create_buckets(app.config)
+
+# per worker: a slot semaphore and an in-flight count for each limited class
+_slots = {name: threading.BoundedSemaphore(limit) for name, limit in concurrency.items() if limit > 0}
+_in_flight = dict.fromkeys(_slots, 0)
+_in_flight_lock = threading.Lock()
+
+# all limited classes together may hold at most WORKER_THREADS - 1 of a gthread
+# worker's threads, so one is always left for lookups outside those classes
+shared_limit = app.config["WORKER_THREADS"] - 1 if app.config["WORKER_THREADS"] > 1 else None
+_shared_slots = threading.BoundedSemaphore(shared_limit) if shared_limit and _slots else None
+
+
+def acquire_slot(route_class, timeout):
+    """Take a slot of `route_class` (and of the shared pool), waiting at most `timeout` seconds"""
+    deadline = time.monotonic() + timeout
+    if not _slots[route_class].acquire(timeout=timeout):
+        return False
+
+    if _shared_slots is not None and not _shared_slots.acquire(timeout=max(deadline - time.monotonic(), 0)):
+        _slots[route_class].release()
+        return False
+
+    with _in_flight_lock:
+        _in_flight[route_class] += 1
+    return True
+
+
+def release_slot(route_class):
+    with _in_flight_lock:
+        _in_flight[route_class] -= 1
+    if _shared_slots is not None:
+        _shared_slots.release()
+    _slots[route_class].release()
+
+
+def client_id():
+    """The client a rate limit applies to: RATE_LIMIT_CLIENT_HEADER if set and sent, else the peer address"""
+    header = app.config["RATE_LIMIT_CLIENT_HEADER"]
+    if header and request.headers.get(header):
+        # X-Forwarded-For lists the original client first
+        return request.headers[header].split(",")[0].strip()
+    return request.remote_addr or "unknown"
+
+
+def _reject(route_class, reason, status, retry_after, message):
+    REJECTED.labels(route_class, reason).inc()
+    response = jsonify({"error": message})
+    response.status_code = status
+    response.headers["Retry-After"] = str(max(math.ceil(retry_after), 1))
+    return response
+
+
+@app.before_request
+def admit_request():
+    """Refuse the request if its client is over its rate limit or its class is at capacity"""
+    if request.endpoint is None or request.endpoint in EXEMPT:
+        return None
+
+    route_class = route_classes.get(request.endpoint, DEFAULT_CLASS)
+
+    if route_class in rate_limits:
+        rate, burst = rate_limits[route_class]
+        wait = buckets.take((route_class, client_id()), rate, burst)
+        if wait > 0:
+            return _reject(route_class, "rate_limit", 429, wait, "Too many requests")
+
+    if route_class in _slots:
+        if not acquire_slot(route_class, app.config["ADMISSION_QUEUE_TIMEOUT"]):
+            return _reject(route_class, "concurrency", 503, app.config["ADMISSION_RETRY_AFTER"],
+                           "Server busy, retry shortly")
+        g.admission_slot = route_class
+
+    return None
+
+
+@app.after_request
+def hold_slot_until_sent(response):
+    """
+    Keep the slot of a streamed response until the server closes it: its
+    body is still being produced after the request context is torn down.
+    """
+    if response.is_streamed:
+        route_class = g.pop("admission_slot", None)
+        if route_class is not None:
+            response.call_on_close(lambda: release_slot(route_class))
+    return response
+
+
+@app.teardown_request
+def release_slot_on_teardown(exc):
+    """Free the slot of a request whose body is complete, or that failed"""
+    route_class = g.pop("admission_slot", None)
+    if route_class is not None:
+        release_slot(route_class)
+
+
+def stats():
+    """Limits of each route class and its requests in flight in this worker"""
+    with _in_flight_lock:
+        in_flight = dict(_in_flight)
+
+    names = sorted(set(concurrency) | set(rate_limits) | set(route_classes.values()) | {DEFAULT_CLASS})
+    return {
+        "rate_limit_backend": app.config["RATE_LIMIT_BACKEND"],
+        "shared_max_in_flight": shared_limit if _shared_slots is not None else None,
+        "classes": {
+            name: {
+                "max_in_flight": concurrency.get(name) or None,
+                "in_flight": in_flight.get(name, 0),
+                "rate_limit": ({"rate": rate_limits[name][0], "burst": rate_limits[name][1]}
+                               if name in rate_limits else None),
+                "routes": sorted(endpoint for endpoint, value in route_classes.items() if value == name),
+            }
+            for name in names
+        },
+    }
@@ -0,0 +1,166 @@
+"""
+Enrollment statistics computed in the database: each report is a single
+GROUP BY query, folded into JSON in one pass over its (small) result.
+
+Reports are cached per time bucket of ANALYTICS_CACHE_BUCKET seconds. The
+bucket boundaries are wall-clock aligned, so every worker recomputes a report
+at the same moment and all of them serve the same figures in between.
+"""
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select
+
+from app import app, db
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.student import Student
+from app.utils.cache import LRUCache
+
+
+GROWTH_INTERVALS = ("day", "week", "month", "year")
+
+_reports = LRUCache(maxsize=app.config["ANALYTICS_CACHE_SIZE"], ttl=app.config["ANALYTICS_CACHE_BUCKET"])
+
+
+def cached_report(name, params, compute):
+    """
+    Serve report `name` for `params` from the current time bucket, computing
+    it with `compute()` on the first request of the bucket.
+
+    Returns:
+        tuple[dict, float]: the report and the seconds left in its bucket.
+    """
+    width = app.config["ANALYTICS_CACHE_BUCKET"]
+    if width <= 0:
+        report = compute()
+        report["as_of"] = datetime.now(timezone.utc)
+        return report, 0
+
+    now = time.time()
+    bucket = int(now // width)
+    remaining = (bucket + 1) * width - now
+
+    key = (name, tuple(sorted(params.items())), bucket)
+    report = _reports.get(key)
+    if report is None:
+        report = compute()
+        report["as_of"] = datetime.fromtimestamp(bucket * width, timezone.utc)
+        _reports.set(key, report, ttl=remaining)
+
+    return report, remaining
+
+
+def enrollments_per_course():
+    """Number of students in every course, most popular first"""
+    enrolled = func.count(Enrollment.id).label("enrolled")
+    rows = db.session.execute(
+        select(Course.id, Course.title, Course.code, enrolled)
+        .outerjoin(Enrollment, Enrollment.course_id == Course.id)
+        .group_by(Course.id, Course.title, Course.code)
+        .order_by(enrolled.desc(), Course.id)
+    ).all()
+
+    return {
+        "courses": [row._asdict() for row in rows],
+        "total_enrollments": sum(row.enrolled for row in rows),
+    }
+
+
+def course_demographics(age_band):
+    """
+    Gender counts and age distribution (in bands of `age_band` years) of the
+    students of every course that has any.
+    """
+    band = ((Student.age // age_band) * age_band).label("age_band")
+    rows = db.session.execute(
+        select(Course.id, Course.title, Course.code, Student.gender, band,
+               func.count().label("students"), func.sum(Student.age).label("age_total"))
+        .join(Enrollment, Enrollment.course_id == Course.id)
+        .join(Student, Student.id == Enrollment.student_id)
+        .group_by(Course.id, Course.title, Course.code, Student.gender, band)
+        .order_by(Course.id)
+    ).all()
+
+    courses = {}
+    for row in rows:
+        course = courses.setdefault(row.id, {
+            "id": row.id,
+            "title": row.title,
+            "code": row.code,
+            "enrolled": 0,
+            "average_age": 0,
+            "gender": {},
+            "age": {},
+        })
+        label = f"{row.age_band}-{row.age_band + age_band - 1}"
+        course["enrolled"] += row.students
+        # MySQL returns SUM() as a Decimal, which would make the average a JSON string
+        course["average_age"] += int(row.age_total)
+        course["gender"][row.gender] = course["gender"].get(row.gender, 0) + row.students
+        course["age"][label] = course["age"].get(label, 0) + row.students
+
+    for course in courses.values():
+        course["average_age"] = round(course["average_age"] / course["enrolled"], 2)
+
+    return {"age_band": age_band, "courses": list(courses.values())}
+
+
+def _period(column, interval):
+    """SQL expression labelling `column` with the day/week/month/year it falls in"""
+    dialect = db.engine.dialect.name
+
+    if dialect == "mysql":
+        if interval == "week":
+            # the Monday starting the week
+            return func.date_format(func.subdate(column, func.weekday(column)), "%Y-%m-%d")
+        return func.date_format(column, {"day": "%Y-%m-%d", "month": "%Y-%m", "year": "%Y"}[interval])
+
+    if dialect == "sqlite":
+        if interval == "week":
+            return func.date(column, "weekday 0", "-6 days")
+        return func.strftime({"day": "%Y-%m-%d", "month": "%Y-%m", "year": "%Y"}[interval], column)
+
+    raise ValueError(f"Enrollment growth is not supported on {dialect}")
+
+
+def enrollment_growth(interval, course_id=None, start=None, end=None):
+    """
+    New enrollments per `interval` (day, week, month or year) from
+    Enrollment.created_at, with the running total.
+
+    Args:
+        interval (str): one of GROWTH_INTERVALS.
+        course_id (int, optional): restrict to one course.
+        start (datetime, optional): first instant included.
+        end (datetime, optional): first instant excluded.
+    """
+    period = _period(Enrollment.created_at, interval).label("period")
+    statement = select(period, func.count().label("enrollments")).group_by(period).order_by(period)
+
+    if course_id is not None:
+        statement = statement.where(Enrollment.course_id == course_id)
+    if start is not None:
+        statement = statement.where(Enrollment.created_at >= start)
+    if end is not None:
+        statement = statement.where(Enrollment.created_at < end)
+
+    # the running total starts from everything enrolled before the window
+    total = 0
+    if start is not None:
+        before = select(func.count()).select_from(Enrollment).where(Enrollment.created_at < start)
+        if course_id is not None:
+            before = before.where(Enrollment.course_id == course_id)
+        total = db.session.scalar(before)
+
+    periods = []
+    for row in db.session.execute(statement):
+        total += row.enrollments
+        periods.append({"period": row.period, "enrollments": row.enrollments, "total": total})
+
+    return {"interval": interval, "course_id": course_id, "periods": periods}
+
+
+def stats():
+    """Hit/miss counters of the report cache"""
+    return _reports.stats()
@@ -0,0 +1,129 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from flask import request
+from werkzeug.exceptions import BadRequest
+
+from app import app
+
+
+MAX_BATCH_SIZE = 10000
+
+# ids accepted by one bulk delete request
+MAX_DELETE_IDS = 100000
+
+
+def read_records():
+    """
+    Read the rows of a bulk upload from the request body.
+
+    Accepted formats:
+        - a JSON array of objects (`application/json`)
+        - newline-delimited JSON (`application/x-ndjson`)
+        - CSV with a header row (`text/csv`)
+        - a multipart upload with a `file` field ending in .json, .ndjson,
+          .jsonl or .csv
+
+    Returns:
+        list[dict]: one dict per uploaded row.
+    """
+    if request.is_json:
+        records = request.get_json()
+        if not isinstance(records, list):
+            raise BadRequest("JSON body must be an array of objects")
+        return records
+
+    if "file" in request.files:
+        upload = request.files["file"]
+        name = (upload.filename or "").lower()
+        body = _decode(upload.read())
+        if name.endswith(".csv"):
+            return _read_csv(body)
+        if name.endswith((".ndjson", ".jsonl")):
+            return _read_ndjson(body)
+        if name.endswith(".json"):
+            try:
+                records = json.loads(body)
+            except ValueError as e:
+                raise BadRequest(f"Invalid JSON: {e}")
+            if not isinstance(records, list):
+                raise BadRequest("JSON file must contain an array of objects")
+            return records
+        raise BadRequest("Uploaded file must be .json, .ndjson, .jsonl or .csv")
+
+    if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        return _read_ndjson(_decode(request.get_data()))
+    if request.mimetype == "text/csv":
+        return _read_csv(_decode(request.get_data()))
+
+    raise BadRequest("Request must be JSON, NDJSON or CSV")
+
+
+def read_ids():
+    """
+    Read the ids of a bulk delete from a JSON body: `{"ids": [1, 2, 3]}`
+    or a bare array.
+
+    Returns:
+        list[int]: the distinct ids, in request order.
+    """
+    if not request.is_json:
+        raise BadRequest("Request must be JSON")
+
+    data = request.get_json()
+    ids = data.get("ids") if isinstance(data, dict) else data
+    if not isinstance(ids, list) or not ids:
+        raise BadRequest('Body must be {"ids": [...]} with at least one id')
+    if len(ids) > MAX_DELETE_IDS:
+        raise BadRequest(f"At most {MAX_DELETE_IDS} ids per request")
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in ids):
+        raise BadRequest("ids must be integers")
+
+    return list(dict.fromkeys(ids))
+
+
+def _decode(data):
+    """Text of an uploaded body, which must be UTF-8 (a leading byte order mark is dropped)"""
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise BadRequest(f"Upload must be UTF-8 encoded: {e}")
+
+
+def _read_ndjson(body):
+    """Parse one JSON object per non-empty line"""
+    try:
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+    except ValueError as e:
+        raise BadRequest(f"Invalid NDJSON: {e}")
+
+
+def _read_csv(body):
+    """Parse CSV rows keyed by the header row; empty cells are dropped"""
+    try:
+        return [{key: value for key, value in row.items() if value not in (None, "")}
+                for row in csv.DictReader(io.StringIO(body))]
+    except csv.Error as e:
+        raise BadRequest(f"Invalid CSV: {e}")
+
+
+def get_batch_size():
+    """Rows inserted per statement, from `batch_size` or BULK_INSERT_BATCH_SIZE"""
+    try:
+        batch_size = int(request.args.get("batch_size", app.config["BULK_INSERT_BATCH_SIZE"]))
+    except ValueError:
+        raise BadRequest("batch_size must be an integer")
+
+    if not 1 <= batch_size <= MAX_BATCH_SIZE:
+        raise BadRequest(f"batch_size must be between 1 and {MAX_BATCH_SIZE}")
+
+    return batch_size
+
+
+def batched(iterable, size):
+    """Yield lists of at most `size` items"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
@@ -0,0 +1,137 @@
+"""
+Incremental change feed: the rows of a table modified after a cursor,
+interleaved with tombstones of the rows deleted since.
+
+Positions in the feed are (timestamp, kind, id) triples, ordered in that
+order, where the timestamp is `updated_at` for upserts and `deleted_at` for
+deletions. Both sources are read with an index range scan after the cursor
+and merged.
+
+Timestamps are assigned by the application before commit, so a slow
+transaction can commit a row stamped slightly in the past. The feed only
+returns changes older than CHANGE_FEED_LAG seconds so those rows are not
+skipped by a client that has already moved past their timestamp.
+"""
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import DateTime, and_, delete, insert, literal, or_, select
+from sqlalchemy.sql import Select
+from werkzeug.exceptions import BadRequest
+
+from app import app, db
+from app.models.tombstone import Tombstone
+
+
+UPSERT, DELETE = 0, 1
+
+
+def _utcnow():
+    """Current UTC time as stored in the DateTime columns (naive)"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def encode_position(position):
+    timestamp, kind, key = position
+    payload = json.dumps([timestamp.isoformat(), kind, key])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_position(cursor):
+    try:
+        timestamp, kind, key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(timestamp), int(kind), int(key)
+    except (ValueError, TypeError):
+        raise BadRequest("after is not a valid cursor")
+
+
+def start_position(updated_since):
+    """Feed position just before every change at or after `updated_since`"""
+    if updated_since.tzinfo is not None:
+        updated_since = updated_since.astimezone(timezone.utc).replace(tzinfo=None)
+    return updated_since, UPSERT, 0
+
+
+def _past(timestamp, key, kind, position):
+    """Rows of `kind` strictly after `position` in feed order"""
+    after_timestamp, after_kind, after_key = position
+    if kind > after_kind:
+        return timestamp >= after_timestamp
+    if kind < after_kind:
+        return timestamp > after_timestamp
+    return or_(timestamp > after_timestamp, and_(timestamp == after_timestamp, key > after_key))
+
+
+def read_changes(entity, model, columns, position=None, limit=100):
+    """
+    One page of changes to `model`.
+
+    Args:
+        entity (str): name the tombstones of `model` are recorded under.
+        columns (list[Column]): the columns returned for upserted rows.
+        position (tuple, optional): the feed position to continue from.
+
+    Returns:
+        tuple[list[dict], tuple | None, bool]: the changes, the position
+        of the last one (or `position` if none), and whether more are ready.
+    """
+    horizon = _utcnow() - timedelta(seconds=app.config["CHANGE_FEED_LAG"])
+
+    upserts = select(*columns).where(model.updated_at <= horizon)
+    deletes = (select(Tombstone.entity_id, Tombstone.deleted_at)
+               .where(Tombstone.entity == entity, Tombstone.deleted_at <= horizon))
+    if position is not None:
+        upserts = upserts.where(_past(model.updated_at, model.id, UPSERT, position))
+        deletes = deletes.where(_past(Tombstone.deleted_at, Tombstone.entity_id, DELETE, position))
+
+    changes = []
+    for row in db.session.execute(upserts.order_by(model.updated_at, model.id).limit(limit + 1)):
+        data = row._asdict()
+        changes.append(((row.updated_at, UPSERT, row.id),
+                        {"op": "upsert", "id": row.id, "at": row.updated_at, "data": data}))
+
+    for row in db.session.execute(deletes.order_by(Tombstone.deleted_at, Tombstone.entity_id).limit(limit + 1)):
+        changes.append(((row.deleted_at, DELETE, row.entity_id),
+                        {"op": "delete", "id": row.entity_id, "at": row.deleted_at}))
+
+    changes.sort(key=lambda change: change[0])
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    if changes:
+        position = changes[-1][0]
+
+    return [change for _, change in changes], position, has_more
+
+
+def record_deleted(entity, ids):
+    """
+    Add tombstones for rows about to be deleted, in the caller's transaction.
+
+    Args:
+        entity (str): name of the table the rows belong to.
+        ids (list[int] | Select): the primary keys, or a SELECT of them.
+    """
+    now = _utcnow()
+    if isinstance(ids, Select):
+        source = ids.subquery()
+        db.session.execute(
+            insert(Tombstone).from_select(
+                ["entity", "entity_id", "deleted_at"],
+                select(literal(entity), source.c[0], literal(now, DateTime))
+            )
+        )
+    elif ids:
+        db.session.execute(insert(Tombstone), [
+            {"entity": entity, "entity_id": entity_id, "deleted_at": now} for entity_id in ids
+        ])
+
+
+def prune(older_than):
+    """Delete tombstones older than the timedelta `older_than`; returns how many"""
+    result = db.session.execute(
+        delete(Tombstone).where(Tombstone.deleted_at < _utcnow() - older_than)
+    )
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,120 @@
+import threading
+
+from sqlalchemy import select
+
+from app import app, db
+from app.models.course import Course
+from app.utils import response_cache
+from app.utils.cache import LRUCache
+
+
+# course catalogue snapshots keyed by ("id", 1), ("title", "Biology") and ("code", "BIO101")
+_cache = LRUCache(maxsize=app.config["COURSE_CACHE_SIZE"], ttl=app.config["COURSE_CACHE_TTL"])
+
+# version kept in the response cache backend, bumped by course creates, updates
+# and deletes only; enrollments change the "courses" responses but not the catalogue
+VERSION_NAMESPACE = "course-catalogue"
+
+# catalogue version the cached snapshots were read under
+_version = None
+_version_lock = threading.Lock()
+
+
+def _snapshot(course):
+    """Plain-dict copy of a course, safe to share between requests and sessions"""
+    return {
+        "id": course.id,
+        "title": course.title,
+        "code": course.code,
+        "description": course.description,
+        "created_at": course.created_at,
+        "updated_at": course.updated_at
+    }
+
+
+def _sync():
+    """
+    Drop the cached courses if the catalogue changed since they were read.
+    `invalidate()` bumps the catalogue version in the response cache
+    backend, which the redis backend shares between workers.
+    """
+    global _version
+    if _cache.ttl <= 0:
+        return
+
+    versions = response_cache.backend.get_versions([VERSION_NAMESPACE])
+    with _version_lock:
+        # while the shared backend is down, nothing is kept across requests
+        if versions is None or versions[0] != _version:
+            _cache.clear()
+            _version = versions[0] if versions is not None else None
+
+
+def _remember(course):
+    snapshot = _snapshot(course)
+    for field in ("id", "title", "code"):
+        _cache.set((field, snapshot[field]), snapshot)
+    return snapshot
+
+
+def get_course(**criteria):
+    """
+    Read-through lookup of a single course by `id`, `title` or `code`.
+
+    Usage:
+        course = get_course(title="Introduction To Biology")
+
+    Returns:
+        dict | None: the course fields, or None if no course matches.
+    """
+    (field, value), = criteria.items()
+
+    _sync()
+    course = _cache.get((field, value))
+    if course is not None:
+        return course
+
+    course = db.session.execute(
+        select(Course).filter_by(**{field: value})
+    ).scalar_one_or_none()
+
+    return _remember(course) if course else None
+
+
+def get_courses_by_title(titles):
+    """
+    Look up many courses by title, querying only the uncached ones (in one IN query).
+
+    Returns:
+        dict[str, dict]: the found courses keyed by title.
+    """
+    _sync()
+    found = {}
+    missing = []
+    for title in titles:
+        course = _cache.get(("title", title))
+        if course is not None:
+            found[title] = course
+        else:
+            missing.append(title)
+
+    if missing:
+        for course in db.session.scalars(select(Course).where(Course.title.in_(missing))):
+            found[course.title] = _remember(course)
+
+    return found
+
+
+def invalidate():
+    """
+    Drop every cached course. Called after each catalogue write; renames
+    change the title/code keys, and the catalogue is small enough to reload.
+    Other workers drop theirs on their next lookup.
+    """
+    _cache.clear()
+    response_cache.invalidate(VERSION_NAMESPACE)
+
+
+def stats():
+    """Hit/miss counters of the course cache"""
+    return _cache.stats()
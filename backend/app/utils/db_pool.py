@@ -0,0 +1,164 @@
+import os
+import sqlite3
+import threading
+import time
+
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection
+    (including opening a new one) and how many checkouts timed out. Each pool
+    keeps its own statistics, so the primary and every replica are reported
+    separately.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = _WaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record_timeout()
+            raise
+        finally:
+            self.wait_stats.record_wait(time.perf_counter() - start)
+
+
+class _WaitStats:
+    """Cumulative checkout wait times of one pool in this process"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.checkouts += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_seconds": self.total / self.checkouts if self.checkouts else 0.0,
+                "max_seconds": self.max,
+            }
+
+
+def engine_options(database_url):
+    """
+    Connection pool settings for SQLALCHEMY_ENGINE_OPTIONS, read from the environment.
+
+    Environment variables:
+        DB_POOL_SIZE (int): Connections kept open per process (default 5).
+        DB_MAX_OVERFLOW (int): Extra connections opened during bursts (default 10).
+        DB_POOL_TIMEOUT (float): Seconds to wait for a free connection (default 10).
+        DB_POOL_RECYCLE (int): Reopen connections older than this many seconds,
+            below MySQL's wait_timeout (default 1800).
+        DB_POOL_PRE_PING (bool): Test connections on checkout, replacing ones
+            closed by the server while idle (default true).
+
+    Each gunicorn worker process has its own pool, so the database sees up
+    to workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+    """
+    options = {
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes"),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    }
+
+    # in-memory and file SQLite databases are set up with their own pools by Flask-SQLAlchemy
+    if database_url and not make_url(database_url).drivername.startswith("sqlite"):
+        options.update({
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+            "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+        })
+
+    return options
+
+
+def replica_binds(replica_urls):
+    """
+    SQLALCHEMY_BINDS entries for the read replicas in DATABASE_REPLICA_URLS.
+
+    Args:
+        replica_urls (str | None): comma-separated database URLs.
+
+    Returns:
+        dict[str, dict]: bind key ("replica_0", "replica_1", ...) to engine
+        options, each replica with its own pool sized by the DB_POOL_* settings.
+    """
+    urls = [url.strip() for url in (replica_urls or "").split(",") if url.strip()]
+    return {f"replica_{i}": {"url": url, **engine_options(url)} for i, url in enumerate(urls)}
+
+
+class RoutingSession(Session):
+    """
+    Session that sends the statements of a request to the replica bind chosen
+    for it (`g.read_bind`, set by `app.utils.replicas.reads_from_replica`).
+    Flushes, explicit binds and requests without a replica use the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context():
+            read_bind = g.get("read_bind")
+            if read_bind is not None:
+                return self._db.engines[read_bind]
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def pool_stats(engine):
+    """
+    Live metrics of an engine's connection pool in this process.
+
+    Returns:
+        dict: pool size, connections checked in/out, overflow in use, and
+        checkout wait statistics of this pool (count, timeouts, average and
+        max seconds), recorded by InstrumentedQueuePool.
+    """
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+
+    if isinstance(pool, InstrumentedQueuePool):
+        stats["checkout_wait"] = pool.wait_stats.snapshot()
+
+    return stats
+
+
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite ignores foreign keys, and so ON DELETE CASCADE, unless enabled on each connection"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
@@ -0,0 +1,50 @@
+"""
+Set-based deletion of students and courses.
+
+Enrollments are removed by the database (ON DELETE CASCADE on their foreign
+keys), so deleting a course with thousands of enrollments is one DELETE
+statement instead of thousands of ORM deletes. Before the rows go, the
+enrollment counters of the other side are decremented and change feed
+tombstones are recorded, all in the caller's transaction.
+"""
+from sqlalchemy import delete, select
+
+from app import db
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.student import Student
+from app.utils import change_feed, enrollment_counts
+
+
+# model -> (its key in enrollments, counter maintenance for the other side)
+_CASCADES = {
+    Student: (Enrollment.student_id, enrollment_counts.remove_student_enrollments),
+    Course: (Enrollment.course_id, enrollment_counts.remove_course_enrollments),
+}
+
+
+def delete_by_ids(model, ids):
+    """
+    Delete the students or courses with the given ids, with their enrollments.
+
+    Args:
+        model (type): Student or Course.
+        ids (Iterable[int]): primary keys; unknown ones are ignored.
+
+    Returns:
+        list[int]: the ids that existed and were deleted.
+    """
+    enrollment_key, uncount = _CASCADES[model]
+
+    found = db.session.scalars(select(model.id).where(model.id.in_(list(ids)))).all()
+    if not found:
+        return []
+
+    uncount(found)
+    change_feed.record_deleted("enrollments", select(Enrollment.id).where(enrollment_key.in_(found)))
+    change_feed.record_deleted(model.__tablename__, found)
+    db.session.execute(
+        delete(model).where(model.id.in_(found)).execution_options(synchronize_session=False)
+    )
+
+    return found
@@ -0,0 +1,102 @@
+"""
+Maintenance of the denormalized `enrollment_count` columns of Course and
+Student. Every helper runs inside the caller's transaction, so the counters
+commit (or roll back) together with the enrollment rows they describe.
+Increments are relative (`count = count + n`), so concurrent enrollments
+never overwrite each other, and rows are always locked in primary key
+order, so concurrent writers touching the same rows cannot deadlock.
+"""
+from collections import Counter
+
+from sqlalchemy import bindparam, func, select, update
+
+from app import db
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.student import Student
+
+
+def _add(model, amounts):
+    """UPDATE model SET enrollment_count = enrollment_count + n for {id: n}, as one executemany"""
+    if not amounts:
+        return
+
+    table = model.__table__
+    db.session.execute(
+        update(table)
+        .where(table.c.id == bindparam("row_id"))
+        .values(enrollment_count=table.c.enrollment_count + bindparam("amount")),
+        [{"row_id": row_id, "amount": amount} for row_id, amount in sorted(amounts.items())]
+    )
+
+
+def _lock_rows(model, condition):
+    """
+    SELECT ... FOR UPDATE the matching rows in primary key order, ahead of a
+    set-based UPDATE whose own scan order the database chooses.
+    """
+    db.session.execute(select(model.id).where(condition).order_by(model.id).with_for_update())
+
+
+def add_enrollments(pairs):
+    """
+    Count new enrollments.
+
+    Args:
+        pairs (Iterable[tuple[int, int]]): the (student_id, course_id) of each new enrollment.
+    """
+    pairs = list(pairs)
+    _add(Student, Counter(student_id for student_id, _ in pairs))
+    _add(Course, Counter(course_id for _, course_id in pairs))
+
+
+def _remove(model, own_key, other_key, ids):
+    """Decrement `model` by its enrollments whose `other_key` is in `ids`, in one UPDATE"""
+    removed = (select(func.count(Enrollment.id))
+               .where(own_key == model.id, other_key.in_(ids))
+               .scalar_subquery())
+    affected = model.id.in_(select(own_key).where(other_key.in_(ids)))
+    _lock_rows(model, affected)
+    db.session.execute(
+        update(model)
+        .where(affected)
+        .values(enrollment_count=model.enrollment_count - removed)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def remove_student_enrollments(student_ids):
+    """Uncount the enrollments of students about to be deleted from their courses"""
+    _remove(Course, Enrollment.course_id, Enrollment.student_id, student_ids)
+
+
+def remove_course_enrollments(course_ids):
+    """Uncount the enrollments of courses about to be deleted from their students"""
+    _remove(Student, Enrollment.student_id, Enrollment.course_id, course_ids)
+
+
+def reconcile():
+    """
+    Recompute every counter from the enrollments table in two set-based
+    UPDATEs, touching only rows whose stored count is wrong.
+
+    Returns:
+        dict[str, int]: number of courses and students corrected.
+    """
+    fixed = {}
+    for name, model, key in (("courses", Course, Enrollment.course_id),
+                             ("students", Student, Enrollment.student_id)):
+        actual = (select(func.count(Enrollment.id))
+                  .where(key == model.id)
+                  .scalar_subquery())
+        _lock_rows(model, model.enrollment_count != actual)
+        result = db.session.execute(
+            update(model)
+            .where(model.enrollment_count != actual)
+            .values(enrollment_count=actual)
+            .execution_options(synchronize_session=False)
+        )
+        fixed[name] = result.rowcount
+
+    db.session.commit()
+    return fixed
@@ -0,0 +1,117 @@
+"""
+Query-string filters, sorting and projection shared by the list endpoints.
+
+A list endpoint declares what it accepts as plain dicts:
+
+    fields  = {"id": Student.id, "age": Student.age, ...}          # `fields=`
+    sorts   = {"id": Student.id, "created_at": Student.created_at}  # `sort=` / `sort=-created_at`
+    filters = {"age_min": (Student.age, operator.ge, int), ...}     # `age_min=18`
+
+and `list_query()` turns a request into a column-limited, filtered SELECT
+ready for `keyset_page` or `stream_ndjson`.
+"""
+from collections import namedtuple
+from datetime import datetime, timezone
+import operator
+
+from flask import request
+from sqlalchemy import select
+from werkzeug.exceptions import BadRequest
+
+from app.utils.pagination import get_fields, get_page_args
+
+
+ListQuery = namedtuple("ListQuery", ["statement", "key", "sort", "descending", "limit", "after"])
+
+
+def escape_like(value):
+    """Escape LIKE wildcards in user input (use with escape="\\\\")"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def parse_datetime(value):
+    """
+    ISO 8601 date (2026-01-31) or datetime (2026-01-31T12:00:00), as the
+    naive UTC the timestamp columns store. A UTC offset (`Z`, `+02:00`) is
+    converted to UTC; without one the value is taken as UTC.
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def date_range(column, name):
+    """`<name>_after` (inclusive) and `<name>_before` (exclusive) filters on a timestamp column"""
+    return {
+        f"{name}_after": (column, operator.ge, parse_datetime),
+        f"{name}_before": (column, operator.lt, parse_datetime),
+    }
+
+
+def email_domain(column, domain):
+    """Emails ending in @<domain>"""
+    return column.like(f"%@{escape_like(domain)}", escape="\\")
+
+
+def apply_filters(statement, filters, args=None):
+    """
+    Add a WHERE clause for every filter present in the query string.
+
+    Args:
+        filters (dict[str, tuple]): parameter name -> (column, comparison, parser).
+            The comparison is called as `comparison(column, parser(value))`.
+
+    Raises:
+        BadRequest: if a value cannot be parsed.
+    """
+    args = request.args if args is None else args
+    for name, (column, compare, parse) in filters.items():
+        value = args.get(name)
+        if value in (None, ""):
+            continue
+        try:
+            value = parse(value.strip())
+        except ValueError as e:
+            raise BadRequest(f"Invalid {name}: {e}")
+        statement = statement.where(compare(column, value))
+    return statement
+
+
+def get_sort(sorts, key, args=None):
+    """
+    Read `sort=<name>` (ascending) or `sort=-<name>` (descending).
+
+    Returns:
+        tuple[Column | None, bool]: the sort column (None when sorting by
+        `key` itself) and whether the order is descending.
+    """
+    value = (request.args if args is None else args).get("sort") or key.key
+    descending = value.startswith("-")
+    name = value.lstrip("-")
+
+    if name not in sorts:
+        raise BadRequest(f"Unknown sort {name!r}. Allowed: {list(sorts)}")
+
+    column = sorts[name]
+    return (None if column is key else column), descending
+
+
+def list_query(key, fields, sorts, filters, args=None):
+    """
+    Build the filtered, projected SELECT of a list endpoint from the query string.
+
+    The sort column is always selected, like `id`, since the page cursor is built from it.
+
+    Returns:
+        ListQuery: the statement and everything needed to page through it.
+    """
+    columns = get_fields(fields, args=args)
+    sort, descending = get_sort(sorts, key, args)
+    if sort is not None and not any(column is sort for column in columns):
+        columns.append(sort)
+
+    limit, after = get_page_args(args, sort=sort)
+    statement = apply_filters(select(*columns), filters, args)
+
+    return ListQuery(statement, key, sort, descending, limit, after)
@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+
+from app import app, db
+from app.utils.cache import LRUCache
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(app.root_path), "migrations")
+
+# the latest probe result, shared by every request of this worker
+_probe_cache = LRUCache(maxsize=1, ttl=app.config["READINESS_CACHE_TTL"])
+_probe_lock = threading.Lock()
+_expected_heads = None
+
+
+def _migration_heads():
+    """Revision(s) at the head of the migration scripts shipped with the app"""
+    global _expected_heads
+    if _expected_heads is None:
+        config = Config()
+        config.set_main_option("script_location", MIGRATIONS_DIR)
+        _expected_heads = set(ScriptDirectory.from_config(config).get_heads())
+    return _expected_heads
+
+
+def _probe():
+    """Check database connectivity and that the schema is at the migration head"""
+    started = time.perf_counter()
+    checks = {}
+
+    try:
+        with db.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            checks["database"] = {"ok": True}
+
+            current = set(MigrationContext.configure(conn).get_current_heads())
+            expected = _migration_heads()
+            checks["migrations"] = {
+                "ok": current == expected,
+                "current": sorted(current),
+                "head": sorted(expected),
+            }
+    except Exception as e:
+        app.logger.error(f"Readiness probe failed: {str(e)}")
+        failed = "migrations" if "database" in checks else "database"
+        checks[failed] = {"ok": False, "error": type(e).__name__}
+
+    return {
+        "ready": all(check["ok"] for check in checks.values()),
+        "checks": checks,
+        "checked_at": time.time(),
+        "probe_seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+def readiness():
+    """
+    Latest readiness probe result, re-probed at most once every
+    READINESS_CACHE_TTL seconds per worker. Concurrent callers wait for a
+    single in-flight probe instead of each hitting the database.
+
+    Returns:
+        dict: `ready`, the individual `checks`, and when they were run.
+    """
+    result = _probe_cache.get("readiness")
+    if result is not None:
+        return result
+
+    with _probe_lock:
+        result = _probe_cache.get("readiness")
+        if result is None:
+            result = _probe()
+            _probe_cache.set("readiness", result)
+
+    return result
@@ -0,0 +1,115 @@
+import os
+import time
+
+import psutil
+from flask import g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter,
+                               Gauge, Histogram, generate_latest, multiprocess)
+
+from app import app
+from app.utils.query_counter import get_query_count, get_query_time
+
+
+# Under gunicorn every worker is a separate process. When PROMETHEUS_MULTIPROC_DIR
+# is set, prometheus_client writes each worker's samples to files in that
+# directory and /metrics aggregates them (see gunicorn.conf.py).
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUEST_COUNT = Counter(
+    "flask_http_requests_total", "HTTP requests served",
+    ["method", "route", "status"])
+REQUEST_LATENCY = Histogram(
+    "flask_http_request_duration_seconds", "Time to build the HTTP response",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS)
+REQUESTS_IN_FLIGHT = Gauge(
+    "flask_http_requests_in_flight", "HTTP requests being handled",
+    multiprocess_mode="livesum")
+
+SQL_QUERIES = Histogram(
+    "flask_http_request_sql_queries", "SQL statements executed per request",
+    ["method", "route"], buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100, 250))
+SQL_DURATION = Histogram(
+    "flask_http_request_sql_duration_seconds", "Time spent in SQL statements per request",
+    ["method", "route"], buckets=LATENCY_BUCKETS)
+
+PROCESS_RSS = Gauge(
+    "flask_process_resident_memory_bytes", "Resident memory of the worker process",
+    multiprocess_mode="liveall")
+PROCESS_CPU = Gauge(
+    "flask_process_cpu_seconds", "User and system CPU time of the worker process",
+    multiprocess_mode="liveall")
+
+# refresh the psutil gauges at most this often per process
+PROCESS_SAMPLE_INTERVAL = 1.0
+_process = {"pid": None, "handle": None, "sampled_at": 0.0}
+
+
+def _route():
+    """The URL rule that matched (e.g. /api/v1.0/students/<int:student_id>), keeping label cardinality low"""
+    return request.url_rule.rule if request.url_rule else "<unmatched>"
+
+
+def _sample_process():
+    now = time.monotonic()
+    if _process["pid"] != os.getpid():
+        # first sample in this (possibly freshly forked) worker
+        _process.update(pid=os.getpid(), handle=psutil.Process(), sampled_at=0.0)
+    elif now - _process["sampled_at"] < PROCESS_SAMPLE_INTERVAL:
+        return
+
+    _process["sampled_at"] = now
+    handle = _process["handle"]
+    cpu = handle.cpu_times()
+    PROCESS_RSS.set(handle.memory_info().rss)
+    PROCESS_CPU.set(cpu.user + cpu.system)
+
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_start = time.perf_counter()
+    g.metrics_in_flight = True
+    REQUESTS_IN_FLIGHT.inc()
+
+
+@app.after_request
+def record_request_metrics(response):
+    start = g.get("metrics_start")
+    if start is None:
+        return response
+
+    route = _route()
+    status = str(response.status_code)
+
+    REQUEST_COUNT.labels(request.method, route, status).inc()
+    REQUEST_LATENCY.labels(request.method, route, status).observe(time.perf_counter() - start)
+    SQL_QUERIES.labels(request.method, route).observe(get_query_count())
+    SQL_DURATION.labels(request.method, route).observe(get_query_time())
+    _sample_process()
+
+    return response
+
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    if g.pop("metrics_in_flight", False):
+        REQUESTS_IN_FLIGHT.dec()
+
+
+def render_metrics():
+    """
+    Exposition of every metric in the Prometheus text format, aggregated
+    across gunicorn workers in multiprocess mode.
+
+    Returns:
+        tuple[bytes, str]: the payload and its content type.
+    """
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        _sample_process()
+        registry = REGISTRY
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,170 @@
+import base64
+import json
+from datetime import datetime
+
+from flask import Response, request, stream_with_context
+from sqlalchemy import DateTime, and_, or_
+from werkzeug.exceptions import BadRequest
+
+from app import app, db
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# rows fetched per round trip from the server-side cursor when streaming
+STREAM_BATCH_SIZE = 1000
+
+
+def encode_cursor(value, key):
+    """Opaque cursor of a page sorted by a non-unique column: the last (value, id) seen"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([value, key]).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort):
+    """Inverse of `encode_cursor` for the sort column `sort`"""
+    try:
+        value, key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if value is not None and isinstance(sort.type, DateTime):
+            value = datetime.fromisoformat(value)
+        return value, int(key)
+    except (ValueError, TypeError):
+        raise BadRequest("after is not a valid cursor")
+
+
+def get_page_args(args=None, sort=None):
+    """
+    Read the keyset pagination parameters from the query string.
+
+    `limit` is the page size (1..MAX_PAGE_SIZE) and `after` is the cursor
+    returned as `next_cursor` by the previous page.
+
+    Args:
+        args (Mapping, optional): query parameters; defaults to `request.args`.
+        sort (Column, optional): the column the list is sorted by when it is
+            not the key; its cursors are opaque (value, id) pairs.
+
+    Returns:
+        tuple[int, int | tuple | None]: the page size and the cursor.
+    """
+    args = request.args if args is None else args
+    after = args.get("after")
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+        if after in (None, ""):
+            after = None
+        elif sort is None:
+            after = int(after)
+    except ValueError:
+        raise BadRequest("limit and after must be integers")
+
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise BadRequest(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    if after is not None and sort is not None:
+        after = decode_cursor(after, sort)
+
+    return limit, after
+
+
+def get_fields(columns, default=None, args=None):
+    """
+    Read the `fields` projection parameter (e.g. `fields=id,title,code`).
+
+    Args:
+        columns (dict[str, Column]): the selectable fields, by name.
+        default (list[str], optional): fields used when `fields` is absent;
+            all of `columns` if not given.
+        args (Mapping, optional): query parameters; defaults to `request.args`.
+
+    Returns:
+        list[Column]: the requested columns. `id` is always included since
+        it is the pagination key.
+    """
+    names = (request.args if args is None else args).get("fields")
+    if not names:
+        names = default or list(columns)
+    else:
+        names = [name.strip() for name in names.split(",") if name.strip()]
+
+    unknown = [name for name in names if name not in columns]
+    if unknown:
+        raise BadRequest(f"Unknown fields {unknown}. Allowed: {list(columns)}")
+
+    if "id" not in names:
+        names = ["id"] + names
+
+    return [columns[name] for name in dict.fromkeys(names)]
+
+
+def wants_stream(args=None):
+    """Check if the client opted in to the streamed NDJSON export"""
+    return (request.args if args is None else args).get("stream", "").lower() in ("1", "true", "yes")
+
+
+def seek(statement, key, after=None, sort=None, descending=False):
+    """
+    Order a select statement by `sort` then the unique `key` (or by `key`
+    alone) and start it just past the cursor `after`. With an index on the
+    sort column this is a range scan, however deep the page.
+    """
+    if after is not None:
+        if sort is None:
+            statement = statement.where(key < after if descending else key > after)
+        else:
+            value, last_key = after
+            statement = statement.where(or_(
+                sort < value if descending else sort > value,
+                and_(sort == value, key < last_key if descending else key > last_key)
+            ))
+
+    order = [key] if sort is None else [sort, key]
+    return statement.order_by(*(column.desc() if descending else column for column in order))
+
+
+def page_cursor(row, key, sort=None):
+    """Cursor of the page following `row`; the sort column must be selected"""
+    if sort is None:
+        return row._mapping[key]
+    return encode_cursor(row._mapping[sort], row._mapping[key])
+
+
+def keyset_page(statement, key, limit, after=None, sort=None, descending=False):
+    """
+    Fetch one page of a select statement ordered by a unique key column,
+    or by a sort column with the key breaking ties.
+
+    One extra row is read to find out whether another page exists, so the
+    database never has to count or skip rows (unlike OFFSET pagination).
+
+    Returns:
+        tuple[list[Row], int | str | None]: the rows of the page and the
+        cursor of the next page, or None on the last page.
+    """
+    statement = seek(statement, key, after, sort, descending)
+    rows = db.session.execute(statement.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = page_cursor(rows[-1], key, sort)
+
+    return rows, next_cursor
+
+
+def stream_ndjson(statement, key, serialize, after=None, sort=None, descending=False):
+    """
+    Stream every row of a select statement as newline-delimited JSON.
+
+    Rows are read through a server-side cursor in batches of
+    STREAM_BATCH_SIZE, so memory stays flat regardless of the table size.
+    """
+    statement = seek(statement, key, after, sort, descending).execution_options(yield_per=STREAM_BATCH_SIZE)
+
+    def generate():
+        for row in db.session.execute(statement):
+            yield app.json.dumps(serialize(row), separators=(",", ":")) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
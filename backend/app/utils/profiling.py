@@ -0,0 +1,156 @@
+"""
+Per-request profiling and the slow-query log.
+
+With SERVER_TIMING enabled every response carries a `Server-Timing` header
+splitting the request's time into SQL (`db`, with the statement count),
+JSON encoding (`serialize`), the rest of the view including ORM hydration
+(`app`) and the total, followed by the slowest statements. Browsers show it
+in the network panel; `curl -sI` shows it too.
+
+Statements slower than SLOW_QUERY_MS are written to the `app.slow_queries`
+logger with the route that ran them and, if SLOW_QUERY_EXPLAIN is set, the
+database's EXPLAIN plan. Plans are fetched on a separate connection once
+the response is built, so they never run inside the request's transaction.
+"""
+import heapq
+import re
+import time
+from contextvars import ContextVar
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import app
+from app.utils.query_counter import get_query_count, get_query_time
+
+
+slow_query_log = app.logger.getChild("slow_queries")
+
+# plan statement of each dialect; others are logged without a plan
+EXPLAIN_PREFIXES = {
+    "mysql": "EXPLAIN ",
+    "postgresql": "EXPLAIN ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+# longest statement text kept in a Server-Timing description
+DESCRIPTION_LENGTH = 120
+
+# set while an EXPLAIN runs, so plans are not themselves reported as slow
+_explaining = ContextVar("explaining_slow_query", default=False)
+
+
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    context.profile_start = time.perf_counter()
+
+
+def _finish_statement(conn, cursor, statement, parameters, context, executemany):
+    """Keep the request's slowest statements and collect the ones over the threshold"""
+    start = getattr(context, "profile_start", None)
+    if start is None or _explaining.get():
+        return
+    elapsed = time.perf_counter() - start
+
+    if not has_request_context():
+        if elapsed * 1000 >= app.config["SLOW_QUERY_MS"] > 0:
+            slow_query_log.warning(f"{elapsed * 1000:.1f} ms outside a request: {_one_line(statement)}")
+        return
+
+    if app.config["SERVER_TIMING"]:
+        slowest = g.setdefault("slowest_statements", [])
+        entry = (elapsed, len(slowest), statement)
+        if len(slowest) < app.config["SERVER_TIMING_STATEMENTS"]:
+            heapq.heappush(slowest, entry)
+        elif slowest:
+            heapq.heappushpop(slowest, entry)
+
+    if elapsed * 1000 >= app.config["SLOW_QUERY_MS"] > 0:
+        g.setdefault("slow_queries", []).append(
+            (elapsed, statement, None if executemany else parameters, conn.engine))
+
+
+def _one_line(statement, limit=None):
+    text = re.sub(r"\s+", " ", statement).strip()
+    return text if limit is None or len(text) <= limit else text[:limit - 3] + "..."
+
+
+def explain(engine, statement, parameters):
+    """
+    The database's plan for a statement, run on a new connection of `engine`.
+
+    Returns:
+        list[str] | None: one line per plan row, or None when the statement
+        or database cannot be explained.
+    """
+    prefix = EXPLAIN_PREFIXES.get(engine.dialect.name)
+    if prefix is None or parameters is None or not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+
+    token = _explaining.set(True)
+    try:
+        with engine.connect() as conn:
+            rows = conn.exec_driver_sql(prefix + statement, parameters).mappings().all()
+        return [", ".join(f"{key}={value}" for key, value in row.items()) for row in rows]
+    except Exception as e:
+        return [f"EXPLAIN failed: {type(e).__name__}: {e}"]
+    finally:
+        _explaining.reset(token)
+
+
+def _description(text):
+    return text.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def server_timing():
+    """The Server-Timing header value for the current request"""
+    total = (time.perf_counter() - g.profile_start) * 1000
+    db_time = get_query_time() * 1000
+    serialize = g.get("serialize_time", 0.0) * 1000
+
+    metrics = [
+        f'db;dur={db_time:.2f};desc="statements={get_query_count()}"',
+        f"serialize;dur={serialize:.2f}",
+        f'app;dur={max(total - db_time - serialize, 0.0):.2f};desc="ORM and view code"',
+        f"total;dur={total:.2f}",
+    ]
+    for rank, (elapsed, _, statement) in enumerate(
+            sorted(g.get("slowest_statements", []), reverse=True), start=1):
+        metrics.append(
+            f'sql-{rank};dur={elapsed * 1000:.2f};desc="{_description(_one_line(statement, DESCRIPTION_LENGTH))}"')
+
+    return ", ".join(metrics)
+
+
+def _log_slow_queries():
+    for elapsed, statement, parameters, engine in g.pop("slow_queries", []):
+        message = f"{elapsed * 1000:.1f} ms in {request.method} {request.path}: {_one_line(statement)}"
+        plan = explain(engine, statement, parameters) if app.config["SLOW_QUERY_EXPLAIN"] else None
+        if plan:
+            message += "\n  plan: " + "\n  plan: ".join(plan)
+        slow_query_log.warning(message)
+
+
+@app.before_request
+def start_profile():
+    g.profile_start = time.perf_counter()
+
+
+@app.after_request
+def add_server_timing(response):
+    if app.config["SERVER_TIMING"] and "profile_start" in g:
+        response.headers["Server-Timing"] = server_timing()
+    return response
+
+
+@app.teardown_request
+def log_slow_queries(exc):
+    """After the other hooks, so EXPLAIN statements stay out of the request's query metrics"""
+    _log_slow_queries()
+
+
+# statement timing costs a little on every query, so it only runs when something uses it
+if app.config["SERVER_TIMING"] or app.config["SLOW_QUERY_MS"] > 0:
+    event.listen(Engine, "before_cursor_execute", _start_statement)
+    event.listen(Engine, "after_cursor_execute", _finish_statement)
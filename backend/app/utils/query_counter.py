@@ -0,0 +1,85 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import app
+
+
+# counters opened with `count_queries()` in the current context
+_active_counters = ContextVar("active_query_counters", default=())
+
+
+class QueryCounter:
+    """Number of SQL statements executed while the counter is active."""
+
+    def __init__(self):
+        self.count = 0
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    """Count every statement sent to the database"""
+    if has_request_context():
+        g.query_count = g.get("query_count", 0) + 1
+
+    for counter in _active_counters.get():
+        counter.count += 1
+
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _time_query(conn, cursor, statement, parameters, context, executemany):
+    """Add the statement's execution time to the request's database time"""
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+
+    if has_request_context():
+        g.query_time = g.get("query_time", 0.0) + elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_failed_query(context):
+    """Failed statements never reach after_cursor_execute; drop their start time"""
+    conn = context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def get_query_count():
+    """Number of SQL statements executed so far by the current request"""
+    return g.get("query_count", 0)
+
+
+def get_query_time():
+    """Seconds spent executing SQL statements so far by the current request"""
+    return g.get("query_time", 0.0)
+
+
+@contextmanager
+def count_queries():
+    """
+    Count the SQL statements executed inside the block.
+
+    Usage:
+        with count_queries() as queries:
+            client.get("/api/v1.0/students/1")
+        assert queries.count == 1
+    """
+    counter = QueryCounter()
+    token = _active_counters.set(_active_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _active_counters.reset(token)
+
+
+@app.after_request
+def add_query_count_header(response):
+    """Report the request's query count in development and testing"""
+    if app.debug or app.testing:
+        response.headers["X-Query-Count"] = str(get_query_count())
+    return response
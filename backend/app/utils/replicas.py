@@ -0,0 +1,148 @@
+"""
+Read replica routing.
+
+GET views decorated with `reads_from_replica` run their queries on one of
+the replicas in DATABASE_REPLICA_URLS, chosen round-robin; everything else
+uses the primary. A client that has just written is pinned to the primary
+for REPLICA_STICKY_SECONDS by a cookie, so it always reads its own writes
+despite replication lag. A replica whose connection fails is left out of
+rotation for REPLICA_RETRY_INTERVAL seconds and the request is retried on
+the primary.
+"""
+import itertools
+import threading
+import time
+from functools import wraps
+
+from flask import g, has_app_context, request
+from sqlalchemy import event, exc
+
+from app import app, db
+from app.utils.db_pool import pool_stats
+
+
+STICKY_COOKIE = "read_primary_until"
+
+# requests with these methods never change data, so they leave stickiness alone
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReplicaSet:
+    """Round-robin over the replica bind keys, skipping ones marked down."""
+
+    def __init__(self, keys, retry_interval):
+        self.keys = list(keys)
+        self.retry_interval = retry_interval
+        self._down_until = dict.fromkeys(self.keys, 0.0)
+        self._rotation = itertools.cycle(self.keys)
+        self._lock = threading.Lock()
+
+    def choose(self):
+        """The next healthy replica, or None when all are down (read from the primary)"""
+        now = time.monotonic()
+        with self._lock:
+            for _ in self.keys:
+                key = next(self._rotation)
+                if self._down_until[key] <= now:
+                    return key
+        return None
+
+    def mark_down(self, key):
+        with self._lock:
+            self._down_until[key] = time.monotonic() + self.retry_interval
+
+    def status(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                key: {"up": until <= now, "retry_in": round(max(until - now, 0.0), 1)}
+                for key, until in self._down_until.items()
+            }
+
+
+replica_set = ReplicaSet(app.config["SQLALCHEMY_BINDS"], app.config["REPLICA_RETRY_INTERVAL"])
+
+
+def _watch(key, engine):
+    @event.listens_for(engine, "handle_error")
+    def _replica_error(context):
+        """Take the replica out of rotation when it cannot be reached or fails a query"""
+        if context.is_disconnect or isinstance(
+                context.sqlalchemy_exception, (exc.OperationalError, exc.InterfaceError)):
+            replica_set.mark_down(key)
+            app.logger.warning(
+                f"Replica {key} failed ({type(context.original_exception).__name__}), "
+                f"out of rotation for {replica_set.retry_interval:g}s")
+            if has_app_context():
+                g.replica_failed = True
+
+
+with app.app_context():
+    for key in replica_set.keys:
+        _watch(key, db.engines[key])
+
+
+def _sticky():
+    """Whether the client wrote recently enough that it must read from the primary"""
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def reads_from_replica(view):
+    """
+    Run a read-only view against a replica when one is configured and healthy.
+
+    If the replica fails during the view, the session is rolled back and the
+    view runs again on the primary. Place it above `response_cache.cached`,
+    so replica and primary reads are cached separately.
+
+    Usage:
+        @app.route("/api/v1.0/students/all", methods=['GET'])
+        @replicas.reads_from_replica
+        @response_cache.cached("students")
+        def get_all_students(): ...
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not replica_set.keys or _sticky():
+            return view(*args, **kwargs)
+
+        g.read_bind = replica_set.choose()
+        response = view(*args, **kwargs)
+
+        if g.pop("replica_failed", False):
+            db.session.rollback()
+            g.read_bind = None
+            response = view(*args, **kwargs)
+
+        return response
+
+    return wrapper
+
+
+@app.after_request
+def pin_writers_to_primary(response):
+    """After a successful write, send the client's reads to the primary for REPLICA_STICKY_SECONDS"""
+    if replica_set.keys and request.method not in SAFE_METHODS and response.status_code < 400:
+        sticky_seconds = app.config["REPLICA_STICKY_SECONDS"]
+        response.set_cookie(
+            STICKY_COOKIE, str(time.time() + sticky_seconds),
+            max_age=max(int(sticky_seconds), 1), httponly=True, samesite="Lax")
+    return response
+
+
+def status():
+    """Rotation state of each replica and the pool of its engine in this worker"""
+    return {
+        "sticky_seconds": app.config["REPLICA_STICKY_SECONDS"],
+        "replicas": {
+            key: {
+                "url": db.engines[key].url.render_as_string(hide_password=True),
+                **state,
+                "pool": pool_stats(db.engines[key]),
+            }
+            for key, state in replica_set.status().items()
+        },
+    }
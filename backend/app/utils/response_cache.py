@@ -0,0 +1,179 @@
+import hashlib
+import json
+import threading
+from functools import wraps
+
+from flask import g, request
+
+from app import app
+from app.utils.cache import LRUCache
+
+
+class LocalBackend:
+    """
+    In-process backend. Entries and namespace versions live in the worker,
+    so with several gunicorn workers a write only invalidates the worker that
+    served it; the others catch up after RESPONSE_CACHE_TTL.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.entries = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, entry):
+        self.entries.set(key, entry)
+
+    def get_versions(self, namespaces):
+        with self._lock:
+            return [self.versions.get(namespace, 0) for namespace in namespaces]
+
+    def bump(self, namespace):
+        with self._lock:
+            self.versions[namespace] = self.versions.get(namespace, 0) + 1
+
+
+class RedisBackend:
+    """
+    Shared backend on Redis or any server speaking its protocol. Requires
+    the optional `redis` package. If the server cannot be reached, requests
+    are served uncached rather than failing.
+    """
+
+    def __init__(self, url, ttl, prefix="response-cache"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the redis package")
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.errors = redis.RedisError
+
+    def get(self, key):
+        try:
+            value = self.client.get(f"{self.prefix}:entry:{key}")
+        except self.errors as e:
+            app.logger.warning(f"Response cache unavailable, reading uncached: {str(e)}")
+            return None
+        return json.loads(value) if value else None
+
+    def set(self, key, entry):
+        if self.ttl > 0:
+            try:
+                self.client.set(f"{self.prefix}:entry:{key}", json.dumps(entry), ex=int(self.ttl))
+            except self.errors as e:
+                app.logger.warning(f"Response cache unavailable, response not stored: {str(e)}")
+
+    def get_versions(self, namespaces):
+        """The namespace versions, or None when they cannot be read (nothing may be cached)"""
+        try:
+            values = self.client.mget([f"{self.prefix}:version:{namespace}" for namespace in namespaces])
+        except self.errors as e:
+            app.logger.warning(f"Response cache unavailable, reading uncached: {str(e)}")
+            return None
+        return [int(value or 0) for value in values]
+
+    def bump(self, namespace):
+        try:
+            self.client.incr(f"{self.prefix}:version:{namespace}")
+        except self.errors as e:
+            # entries of the namespace stay reachable until RESPONSE_CACHE_TTL expires them
+            app.logger.error(f"Response cache unavailable, {namespace} not invalidated: {str(e)}")
+
+
+class NullBackend:
+    """Disables response caching; conditional GET still works per request."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, entry):
+        pass
+
+    def get_versions(self, namespaces):
+        return [0 for _ in namespaces]
+
+    def bump(self, namespace):
+        pass
+
+
+def create_backend(config):
+    """Build the backend selected by RESPONSE_CACHE_BACKEND (local, redis or none)"""
+    name = config["RESPONSE_CACHE_BACKEND"]
+    ttl = config["RESPONSE_CACHE_TTL"]
+
+    if name == "local":
+        return LocalBackend(maxsize=config["RESPONSE_CACHE_SIZE"], ttl=ttl)
+    if name == "redis":
+        return RedisBackend(config["RESPONSE_CACHE_URL"], ttl=ttl)
+    if name == "none":
+        return NullBackend()
+
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND {name!r}")
+
+
+backend = create_backend(app.config)
+
+
+def cached(*namespaces):
+    """
+    Cache the body of a GET view and answer conditional requests.
+
+    The cache key combines the request path and query string with the current
+    version of each namespace the payload depends on ("students", "courses").
+    Write routes call `invalidate()` to bump those versions, which makes every
+    older entry unreachable. The strong ETag is a hash of the payload, so a
+    matching `If-None-Match` gets a 304 without the view running.
+
+    Usage:
+        @app.route("/api/v1.0/courses/<int:course_id>")
+        @cached("courses")
+        def get_course_by_id(course_id): ...
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = backend.get_versions(namespaces)
+            key = entry = None
+            if versions is not None:
+                # replica reads may lag, so they never answer clients pinned to the primary
+                source = "replica" if g.get("read_bind") else "primary"
+                key = hashlib.sha1(
+                    f"{request.full_path}|{namespaces}|{versions}|{source}".encode()
+                ).hexdigest()
+                entry = backend.get(key)
+
+            if entry is None:
+                response = app.make_response(view(*args, **kwargs))
+
+                # only complete, successful payloads are cached
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+
+                body = response.get_data()
+                entry = {
+                    "etag": hashlib.sha256(body).hexdigest(),
+                    "body": body.decode("utf-8"),
+                    "mimetype": response.mimetype,
+                }
+                if key is not None:
+                    backend.set(key, entry)
+
+            response = app.response_class(entry["body"], status=200, mimetype=entry["mimetype"])
+            response.set_etag(entry["etag"])
+            response.headers["Cache-Control"] = "no-cache"
+            return response.make_conditional(request)
+
+        return wrapper
+    return decorator
+
+
+def invalidate(*namespaces):
+    """Expire the cached responses of the given namespaces after a write"""
+    for namespace in namespaces:
+        backend.bump(namespace)
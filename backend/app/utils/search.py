@@ -0,0 +1,155 @@
+"""
+Ranked search over students (full_name, email) and courses (title, code).
+
+On MySQL every term is matched as a word prefix against the FULLTEXT indexes
+(ft_students_full_name_email, ft_courses_title_code) and results are ranked
+by relevance. Terms shorter than the FULLTEXT minimum token size, and
+every term on other databases, are matched as word prefixes with LIKE
+instead; the other terms of the query keep using the FULLTEXT index.
+"""
+import re
+
+from flask import request
+from sqlalchemy import case, func, literal, or_, select
+from sqlalchemy.dialects.mysql import match
+from werkzeug.exceptions import BadRequest
+
+from app import db
+from app.models.course import Course
+from app.models.student import Student
+from app.utils.filters import escape_like
+
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# ranked results are paginated by offset; deeper pages mean a more specific query is needed
+MAX_SEARCH_OFFSET = 1000
+MAX_QUERY_LENGTH = 100
+
+# innodb_ft_min_token_size: shorter words are not in the FULLTEXT index
+FULLTEXT_MIN_TOKEN_SIZE = 3
+
+# what can be searched: the columns matched and the columns returned
+TARGETS = {
+    "students": (Student, (Student.full_name, Student.email), (Student.id, Student.full_name, Student.email)),
+    "courses": (Course, (Course.title, Course.code), (Course.id, Course.title, Course.code)),
+}
+
+
+def get_search_args(args=None):
+    """
+    Read the search parameters from the query string.
+
+    Returns:
+        tuple[str, list[str], int, int]: the query, its terms, the page size and offset.
+    """
+    args = request.args if args is None else args
+
+    query = args.get("q", "").strip()
+    if not query:
+        raise BadRequest("q parameter is required")
+    if len(query) > MAX_QUERY_LENGTH:
+        raise BadRequest(f"q must be at most {MAX_QUERY_LENGTH} characters")
+
+    terms = re.findall(r"\w+", query.lower())
+    if not terms:
+        raise BadRequest("q must contain at least one letter or digit")
+
+    try:
+        limit = int(args.get("limit", DEFAULT_SEARCH_LIMIT))
+        offset = int(args.get("offset", 0))
+    except ValueError:
+        raise BadRequest("limit and offset must be integers")
+
+    if not 1 <= limit <= MAX_SEARCH_LIMIT:
+        raise BadRequest(f"limit must be between 1 and {MAX_SEARCH_LIMIT}")
+    if not 0 <= offset <= MAX_SEARCH_OFFSET:
+        raise BadRequest(f"offset must be between 0 and {MAX_SEARCH_OFFSET}")
+
+    return query, terms, limit, offset
+
+
+def _exact_bonus(columns, query):
+    """Rank a column equal to the whole query (e.g. a full email or course code) above partial matches"""
+    bonus = literal(0)
+    for column in columns:
+        bonus = bonus + case((func.lower(column) == query.lower(), 10), else_=0)
+    return bonus
+
+
+def _like_search(columns, terms):
+    """
+    Every term must start a word of one of the columns. Matches at the start
+    of a column rank above matches inside it.
+    """
+    conditions = []
+    score = literal(0)
+    for term in terms:
+        term = escape_like(term)
+        matches = []
+        for column in columns:
+            prefix = column.like(f"{term}%", escape="\\")
+            word = column.like(f"% {term}%", escape="\\")
+            matches.extend((prefix, word))
+            score = score + case((prefix, 2), (word, 1), else_=0)
+        conditions.append(or_(*matches))
+
+    return conditions, score
+
+
+def _fulltext_search(columns, terms):
+    """Boolean-mode MATCH requiring every term as a word prefix, ranked by relevance"""
+    against = " ".join(f"+{term}*" for term in terms)
+    relevance = match(*columns, against=against).in_boolean_mode()
+
+    return [relevance > 0], relevance
+
+
+def search(target, query, terms, limit, offset):
+    """
+    One page of ranked matches of `target` ("students" or "courses").
+
+    Returns:
+        tuple[list[dict], int | None]: the matches, best first, each with its
+        `score`, and the offset of the next page (None on the last page).
+    """
+    model, columns, fields = TARGETS[target]
+
+    if db.engine.dialect.name == "mysql":
+        indexed = [term for term in terms if len(term) >= FULLTEXT_MIN_TOKEN_SIZE]
+        short = [term for term in terms if len(term) < FULLTEXT_MIN_TOKEN_SIZE]
+    else:
+        indexed, short = [], terms
+
+    conditions, score = [], literal(0)
+    if indexed:
+        fulltext_conditions, relevance = _fulltext_search(columns, indexed)
+        conditions += fulltext_conditions
+        score = score + relevance
+    if short:
+        like_conditions, like_score = _like_search(columns, short)
+        conditions += like_conditions
+        score = score + like_score
+
+    # exact matches of the whole query rank first
+    score = (score + _exact_bonus(columns, query)).label("score")
+    rows = db.session.execute(
+        select(*fields, score)
+        .where(*conditions)
+        .order_by(score.desc(), model.id)
+        .limit(limit + 1)
+        .offset(offset)
+    ).all()
+
+    next_offset = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_offset = offset + limit
+
+    results = []
+    for row in rows:
+        result = row._asdict()
+        result["score"] = round(float(result["score"]), 4)
+        results.append(result)
+
+    return results, next_offset
@@ -0,0 +1,185 @@
+"""
+Synthetic data for development databases and benchmarks.
+
+Students, courses and enrollments are generated from a seeded random number
+generator, so the same arguments always produce the same rows. Course
+popularity follows a Zipf-like curve (a few large introductory courses, a
+long tail of small ones) and each student takes a normally distributed
+number of courses. Rows are written with bulk INSERTs of
+BULK_INSERT_BATCH_SIZE rows, and the `enrollment_count` columns are filled
+in directly instead of being incremented per enrollment.
+"""
+import bisect
+import itertools
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+
+from app import app, db
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.student import Student
+from app.models.tombstone import Tombstone
+from app.utils.bulk import batched
+
+
+FIRST_NAMES = [
+    "Ada", "Amina", "Ben", "Chen", "Chidi", "Daniel", "Emeka", "Fatima", "Grace", "Hassan",
+    "Ibrahim", "Ifeoma", "James", "Kemi", "Lara", "Maria", "Mohammed", "Ngozi", "Olu", "Priya",
+    "Sade", "Samuel", "Sofia", "Tunde", "Yusuf", "Zainab",
+]
+LAST_NAMES = [
+    "Adeyemi", "Bello", "Brown", "Chukwu", "Garcia", "Ibrahim", "Johnson", "Kim", "Mensah",
+    "Nwosu", "Okafor", "Olawale", "Patel", "Smith", "Williams", "Wong", "Yusuf",
+]
+EMAIL_DOMAINS = ["gmail.com", "yahoo.com", "outlook.com", "student.example.edu"]
+SUBJECTS = [
+    "Accounting", "Anatomy", "Biology", "Chemistry", "Computer Science", "Economics",
+    "English", "Geography", "History", "Law", "Literature", "Mathematics", "Music",
+    "Philosophy", "Physics", "Psychology", "Sociology", "Statistics",
+]
+
+# exponent of the course popularity curve; larger values concentrate enrollments
+POPULARITY_SKEW = 1.1
+
+# rows are created over this many days before now
+HISTORY_DAYS = 730
+
+
+def course_title(i):
+    """Unique title of the i-th generated course (0-based), e.g. "Biology 102" """
+    level, subject = divmod(i, len(SUBJECTS))
+    return f"{SUBJECTS[subject]} {101 + level}"
+
+
+def course_code(i):
+    """Unique code of the i-th generated course (0-based), e.g. "BIO1002" """
+    level, subject = divmod(i, len(SUBJECTS))
+    return f"{SUBJECTS[subject][:3].upper()}{1001 + level}"
+
+
+def _timestamps(rng, i, total, now):
+    """created_at increasing with the row number, updated_at some time after it"""
+    created_at = now - timedelta(days=HISTORY_DAYS * (1 - i / total), seconds=rng.randint(0, 3600))
+    updated_at = min(created_at + timedelta(days=rng.expovariate(1 / 30)), now)
+    return created_at, updated_at
+
+
+def _course_rows(rng, count, first_id, now):
+    for i in range(count):
+        created_at, updated_at = _timestamps(rng, i, count, now)
+        yield {
+            "id": first_id + i,
+            "title": course_title(first_id - 1 + i),
+            "code": course_code(first_id - 1 + i),
+            "description": f"Generated course {first_id + i}",
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+
+
+def _enrollment_rows(rng, student, course_ids, now):
+    """Enrollments of a student, each made some time after the student was created"""
+    for course_id in sorted(course_ids):
+        enrolled_at = min(student["created_at"] + timedelta(days=rng.expovariate(1 / 14)), now)
+        yield {
+            "student_id": student["id"],
+            "course_id": course_id,
+            "created_at": enrolled_at,
+            "updated_at": enrolled_at,
+        }
+
+
+def _student_rows(rng, count, first_id, course_ids, enrollments_per_student, now):
+    """Yield (student row, course ids) pairs, the courses drawn by popularity"""
+    # cumulative weights of a Zipf-like popularity curve over the courses
+    cum_weights = list(itertools.accumulate(
+        1 / (rank ** POPULARITY_SKEW) for rank in range(1, len(course_ids) + 1)))
+    total_weight = cum_weights[-1] if cum_weights else 0.0
+
+    for i in range(count):
+        student_id = first_id + i
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created_at, updated_at = _timestamps(rng, i, count, now)
+
+        wanted = max(0, min(round(rng.gauss(enrollments_per_student, 1.5)), len(course_ids)))
+        courses = set()
+        while len(courses) < wanted:
+            courses.add(course_ids[bisect.bisect(cum_weights, rng.random() * total_weight)])
+
+        yield {
+            "id": student_id,
+            "full_name": f"{first} {last}",
+            "age": min(17 + int(rng.expovariate(1 / 4)), 60),
+            "gender": rng.choice(("Male", "Female")),
+            "email": f"{first.lower()}.{last.lower()}{student_id}@{rng.choice(EMAIL_DOMAINS)}",
+            "enrollment_count": len(courses),
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }, courses
+
+
+def seed(students, courses, enrollments_per_student=3.0, random_seed=42, batch_size=None):
+    """
+    Add generated courses, students and their enrollments to the database,
+    after any rows already there.
+
+    Args:
+        students (int): number of students to add.
+        courses (int): number of courses to add; students only enroll in these.
+        enrollments_per_student (float): mean number of courses per student.
+        random_seed (int): seed of the generator; equal seeds give equal data.
+        batch_size (int, optional): rows per INSERT (default BULK_INSERT_BATCH_SIZE).
+
+    Returns:
+        dict[str, int]: number of students, courses and enrollments inserted.
+    """
+    batch_size = batch_size or app.config["BULK_INSERT_BATCH_SIZE"]
+    rng = random.Random(random_seed)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    first_course = (db.session.scalar(select(func.max(Course.id))) or 0) + 1
+    first_student = (db.session.scalar(select(func.max(Student.id))) or 0) + 1
+
+    # the counter update below must keep the generated updated_at of each course
+    course_updated_at = {}
+    for batch in batched(_course_rows(rng, courses, first_course, now), batch_size):
+        db.session.execute(insert(Course), batch)
+        course_updated_at.update((course["id"], course["updated_at"]) for course in batch)
+
+    course_ids = list(range(first_course, first_course + courses))
+    course_counts = Counter()
+    enrollments = 0
+
+    rows = _student_rows(rng, students, first_student, course_ids, enrollments_per_student, now)
+    for batch in batched(rows, batch_size):
+        db.session.execute(insert(Student), [student for student, _ in batch])
+
+        pairs = [enrollment for student, course_ids_taken in batch
+                 for enrollment in _enrollment_rows(rng, student, course_ids_taken, now)]
+        for chunk in batched(pairs, batch_size):
+            db.session.execute(insert(Enrollment), chunk)
+
+        course_counts.update(pair["course_id"] for pair in pairs)
+        enrollments += len(pairs)
+
+    if course_counts:
+        db.session.execute(
+            update(Course.__table__)
+            .where(Course.__table__.c.id == bindparam("row_id"))
+            .values(enrollment_count=bindparam("total"), updated_at=bindparam("row_updated_at")),
+            [{"row_id": course_id, "total": total, "row_updated_at": course_updated_at[course_id]}
+             for course_id, total in course_counts.items()]
+        )
+
+    db.session.commit()
+    return {"students": students, "courses": courses, "enrollments": enrollments}
+
+
+def clear():
+    """Delete every enrollment, student, course and tombstone, keeping the schema"""
+    for model in (Enrollment, Student, Course, Tombstone):
+        db.session.execute(delete(model))
+    db.session.commit()
@@ -0,0 +1,58 @@
+"""
+JSON-ready representations of the models, shared by every route that returns
+model instances (rather than projected rows). Timestamps are left as
+datetimes; the app's JSON provider renders them as ISO 8601.
+"""
+
+
+def serialize_course(course):
+    return {
+        "id": course.id,
+        "title": course.title,
+        "code": course.code,
+        "description": course.description,
+        "enrollment_count": course.enrollment_count,
+        "created_at": course.created_at,
+        "updated_at": course.updated_at
+    }
+
+
+def serialize_course_summary(course):
+    """The short form of a course listed inside a student"""
+    return {
+        "id": course.id,
+        "title": course.title,
+        "created_at": course.created_at
+    }
+
+
+def serialize_student(student, courses=None):
+    """
+    Args:
+        student (Student): the student.
+        courses (list[Course], optional): their courses, included as
+            `courses` summaries when given.
+    """
+    data = {
+        "id": student.id,
+        "full_name": student.full_name,
+        "age": student.age,
+        "email": student.email,
+        "gender": student.gender,
+        "enrollment_count": student.enrollment_count,
+        "created_at": student.created_at,
+        "updated_at": student.updated_at
+    }
+    if courses is not None:
+        data["courses"] = [serialize_course_summary(course) for course in courses]
+    return data
+
+
+def serialize_enrollment(enrollment):
+    return {
+        "id": enrollment.id,
+        "student_id": enrollment.student_id,
+        "course_id": enrollment.course_id,
+        "created_at": enrollment.created_at,
+        "updated_at": enrollment.updated_at
+    }
@@ -0,0 +1 @@
+from app.asgi import asgi_app as app
@@ -0,0 +1,145 @@
+"""
+Enrollment lookup latency with and without the enrollment/email indexes.
+
+Builds the schema from the models in a throwaway SQLite database, fills it
+with synthetic rows (`app.utils.seed`) at each table size, and times the
+lookups the API runs on every write: enrollment by (student_id, course_id),
+enrollments by course and student by email. The same lookups are then
+repeated after dropping the indexes added in migration 7af7e8f742e6 (on
+MySQL, single-column foreign key indexes take their place, as before that
+migration), and the indexes are restored afterwards.
+
+Usage (from backend/):
+    python -m benchmarks.index_benchmark --sizes 1000 10000 100000
+    python -m benchmarks.index_benchmark --database-url mysql+pymysql://...
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+from sqlalchemy import select, text
+
+
+INDEXES = {
+    "uq_enrollments_student_course": "enrollments",
+    "ix_enrollments_course_student": "enrollments",
+    "ix_students_email": "students",
+}
+
+# mean courses per student; the enrollment count is approximate
+ENROLLMENTS_PER_STUDENT = 4
+
+
+def seed(enrollments, courses=200):
+    """Recreate the schema and about `enrollments` rows over `enrollments // 4` students"""
+    from app import db
+    from app.utils.seed import seed as seed_rows
+
+    db.drop_all()
+    db.create_all()
+
+    students = max(enrollments // ENROLLMENTS_PER_STUDENT, 1)
+    seeded = seed_rows(students, courses, enrollments_per_student=ENROLLMENTS_PER_STUDENT)
+    return students, courses, seeded["enrollments"]
+
+
+def time_lookups(engine, students, courses, repeat):
+    """Median latency in microseconds of each lookup"""
+    from app.models.enrollment import Enrollment
+    from app.models.student import Student
+
+    rng = random.Random(7)
+    with engine.connect() as conn:
+        emails = conn.execute(select(Student.email)).scalars().all()
+
+    lookups = {
+        "enrollment by (student, course)": lambda: select(Enrollment.id).where(
+            Enrollment.student_id == rng.randint(1, students),
+            Enrollment.course_id == rng.randint(1, courses)),
+        "students of a course": lambda: select(Enrollment.student_id).where(
+            Enrollment.course_id == rng.randint(1, courses)).limit(100),
+        "student by email": lambda: select(Student.id).where(Student.email == rng.choice(emails)),
+    }
+
+    results = {}
+    with engine.connect() as conn:
+        for name, build in lookups.items():
+            timings = []
+            for _ in range(repeat):
+                statement = build()
+                start = time.perf_counter()
+                conn.execute(statement).all()
+                timings.append((time.perf_counter() - start) * 1e6)
+            results[name] = statistics.median(timings)
+    return results
+
+
+# single-column indexes MySQL needs on the foreign keys before the composite
+# indexes backing them can be dropped (error 1553), as in the migration's downgrade
+FOREIGN_KEY_INDEXES = {
+    "ix_enrollments_student_id": ("enrollments", "student_id"),
+    "ix_enrollments_course_id": ("enrollments", "course_id"),
+}
+
+
+def drop_indexes(engine):
+    with engine.begin() as conn:
+        if engine.dialect.name == "mysql":
+            for name, (table, column) in FOREIGN_KEY_INDEXES.items():
+                conn.execute(text(f"CREATE INDEX {name} ON {table} ({column})"))
+
+        for name, table in INDEXES.items():
+            if engine.dialect.name == "mysql":
+                conn.execute(text(f"DROP INDEX {name} ON {table}"))
+            else:
+                conn.execute(text(f"DROP INDEX {name}"))
+
+
+def restore_indexes(engine):
+    """Recreate the dropped indexes from the models, then remove the foreign key ones"""
+    from app import db
+
+    with engine.begin() as conn:
+        for name, table in INDEXES.items():
+            index, = (index for index in db.metadata.tables[table].indexes if index.name == name)
+            index.create(conn, checkfirst=True)
+
+        if engine.dialect.name == "mysql":
+            for name, (table, column) in FOREIGN_KEY_INDEXES.items():
+                conn.execute(text(f"DROP INDEX {name} ON {table}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="number of enrollment rows per run")
+    parser.add_argument("--repeat", type=int, default=200, help="lookups per measurement")
+    parser.add_argument("--database-url", default="sqlite:///index_benchmark.db",
+                        help="scratch database; its tables are dropped and recreated")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from app import app, db
+
+    print(f"{'rows':>10}  {'lookup':<34}{'indexed (us)':>14}{'no index (us)':>15}")
+    with app.app_context():
+        engine = db.engine
+        for size in args.sizes:
+            students, courses, rows = seed(size)
+            indexed = time_lookups(engine, students, courses, args.repeat)
+            drop_indexes(engine)
+            try:
+                unindexed = time_lookups(engine, students, courses, args.repeat)
+            finally:
+                restore_indexes(engine)
+
+            for name in indexed:
+                print(f"{rows:>10}  {name:<34}{indexed[name]:>14.1f}{unindexed[name]:>15.1f}")
+
+        db.drop_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Local load test comparing serving configurations.
+
+For every configuration the harness starts `gunicorn main:app` (using
+gunicorn.conf.py) or the ASGI app against a seeded SQLite database, drives it with
+concurrent keep-alive clients for a fixed duration, and reports throughput
+and latency percentiles.
+
+A configuration is written as CLASS:WORKERS[xTHREADS], e.g. `sync:4`,
+`gthread:4x8` or `gevent:4` (gevent must be installed). `uvicorn:WORKERS`
+runs the ASGI serving mode (`uvicorn asgi:app`, requirements-asgi.txt)
+instead of gunicorn.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --configs sync:4 gthread:4x8 --concurrency 32
+    python -m benchmarks.load_test --configs gthread:4x8 uvicorn:4 --concurrency 256
+"""
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+DEFAULT_PATHS = [
+    "/api/v1.0/students/all?limit=50",
+    "/api/v1.0/courses/all",
+    "/api/v1.0/courses/1",
+    "/api/v1.0/students/1",
+]
+
+
+def seed(database_url, students, courses):
+    """Create the schema and synthetic rows (`app.utils.seed`) in a fresh database"""
+    os.environ["DATABASE_URL"] = database_url
+    from app import app, db
+    from app.utils.seed import seed as seed_rows
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed_rows(students, courses)
+
+
+def server_command(spec, port):
+    """Command line and environment that start the server described by `spec`"""
+    worker_class, _, size = spec.partition(":")
+    workers, _, threads = size.partition("x")
+
+    if worker_class == "uvicorn":
+        return [sys.executable, "-m", "uvicorn", "asgi:app", "--port", str(port),
+                "--workers", workers or "1", "--log-level", "warning", "--no-access-log"], {}
+
+    return [sys.executable, "-m", "gunicorn", "main:app"], {
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        "GUNICORN_WORKER_CLASS": worker_class,
+        "GUNICORN_WORKERS": workers or "1",
+        "GUNICORN_THREADS": threads or "1",
+    }
+
+
+def wait_until_up(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def run_clients(port, paths, concurrency, duration):
+    """Hammer the server for `duration` seconds; returns latencies (s) and error count"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client(offset):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local, failed, i = [], 0, offset
+        while time.monotonic() < stop_at:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 500:
+                    failed += 1
+            except (OSError, http.client.HTTPException) as e:
+                # a recycled worker closing an idle keep-alive connection is not a
+                # failed request; clients retry those transparently
+                if not isinstance(e, (http.client.RemoteDisconnected, ConnectionResetError)):
+                    failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return latencies, errors[0]
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--configs", nargs="+", default=["sync:4", "gthread:4x4", "gthread:2x16"])
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per configuration")
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--courses", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    parser.add_argument("--admission", action="store_true",
+                        help="keep admission control on; shed requests (503) are counted as errors")
+    parser.add_argument("--database-url",
+                        help="scratch database whose tables are dropped and reseeded (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        workdir = tempfile.mkdtemp(prefix="load-test-")
+        database_url = f"sqlite:///{os.path.join(workdir, 'load_test.db')}"
+    seed(database_url, args.students, args.courses)
+
+    print(f"{'config':<16}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for spec in args.configs:
+        command, settings = server_command(spec, args.port)
+        env = dict(os.environ, DATABASE_URL=database_url, GUNICORN_ACCESSLOG="",
+                   GUNICORN_LOGLEVEL="warning", **settings)
+        if not args.admission:
+            # measure raw serving capacity rather than the configured limits
+            env.update(ADMISSION_CONCURRENCY="", RATE_LIMITS="")
+        server = subprocess.Popen(command, env=env)
+        try:
+            wait_until_up(args.port)
+            latencies, errors = run_clients(args.port, args.paths, args.concurrency, args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+
+        if not latencies:
+            print(f"{spec:<16}{'no successful requests':>38}")
+            continue
+
+        print(f"{spec:<16}{len(latencies) / args.duration:>10.0f}"
+              f"{statistics.median(latencies) * 1000:>10.2f}"
+              f"{percentile(latencies, 99) * 1000:>10.2f}{errors:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+JSON encoding throughput of the list endpoints' payloads.
+
+Builds a page of synthetic student rows (as returned by /students/all, with
+datetimes) and times encoding it into a response body with Flask's stock
+provider, the app's standard library provider and the orjson provider.
+
+Usage (from backend/):
+    python -m benchmarks.serialization_benchmark --rows 10000
+"""
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from flask.json.provider import DefaultJSONProvider
+
+from app import app
+from app.utils.json_provider import JSONProvider, OrjsonProvider, orjson
+
+
+def build_rows(count):
+    """`count` student rows shaped like the /students/all payload"""
+    created = datetime(2025, 1, 1, 8, 30)
+    return [{
+        "id": i,
+        "full_name": f"Student Number {i}",
+        "age": 18 + i % 10,
+        "email": f"Student{i}@Example.Com",
+        "gender": "Female" if i % 2 else "Male",
+        "enrollment_count": i % 7,
+        "created_at": created + timedelta(minutes=i),
+        "updated_at": created + timedelta(minutes=i, seconds=30, microseconds=i),
+    } for i in range(1, count + 1)]
+
+
+def time_provider(provider, payload, repeat):
+    """Median seconds to build the response body and its size in bytes"""
+    timings = []
+    with app.app_context():
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = provider.response(payload).get_data()
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000],
+                        help="rows per payload")
+    parser.add_argument("--repeat", type=int, default=20, help="encodings per measurement")
+    args = parser.parse_args()
+
+    providers = {
+        "flask default": DefaultJSONProvider(app),
+        "stdlib (JSONProvider)": JSONProvider(app),
+    }
+    if orjson is not None:
+        providers["orjson (OrjsonProvider)"] = OrjsonProvider(app)
+    else:
+        print("orjson is not installed; skipping OrjsonProvider")
+
+    print(f"{'rows':>8}  {'provider':<26}{'median (ms)':>12}{'rows/s':>12}{'MB/s':>9}")
+    for count in args.rows:
+        payload = {"students": build_rows(count), "limit": count, "next_cursor": None}
+        for name, provider in providers.items():
+            seconds, size = time_provider(provider, payload, args.repeat)
+            print(f"{count:>8}  {name:<26}{seconds * 1000:>12.2f}{count / seconds:>12,.0f}"
+                  f"{size / seconds / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
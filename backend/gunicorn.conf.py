@@ -0,0 +1,55 @@
+"""
+Gunicorn configuration for serving `main:app` in production.
+
+Gunicorn loads this file automatically when started from backend/:
+    gunicorn main:app
+
+Every setting can be overridden with an environment variable, e.g.
+    GUNICORN_WORKERS=8 GUNICORN_WORKER_CLASS=gthread GUNICORN_THREADS=4 gunicorn main:app
+"""
+import multiprocessing
+import os
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8080")
+
+# sync: one request per process; gthread: `threads` requests per process;
+# gevent: cooperative greenlets (requires `pip install gevent`)
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 1000)) # gevent only
+
+# seconds to hold an idle keep-alive connection open
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+
+# recycle workers after this many requests (plus jitter) to bound memory growth
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+# import the app once in the master so workers fork with it already loaded
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-") or None # empty disables the access log
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOGLEVEL", "info")
+
+
+def child_exit(server, worker):
+    """Stop aggregating the live gauges of a worker that exited"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the master; each worker opens its own"""
+    from app import app, db
+
+    with app.app_context():
+        # the primary and every read replica
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -96,7 +96,22 @@ def run_migrations_online():
 
     connectable = get_engine()
 
+    # skip objects declared for another database with .ddl_if(dialect=...),
+    # e.g. the MySQL-only FULLTEXT indexes
+    def include_object(object, name, type_, reflected, compare_to):
+        ddl_if = getattr(object, '_ddl_if', None)
+        return not (ddl_if and ddl_if.dialect and ddl_if.dialect != connectable.dialect.name)
+
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
+
     with connectable.connect() as connection:
+        if connection.dialect.name == 'sqlite':
+            # batch migrations copy and drop tables; with foreign keys on,
+            # dropping a parent table would cascade into its children
+            connection.exec_driver_sql('PRAGMA foreign_keys=OFF')
+            connection.commit()
+
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
@@ -0,0 +1,37 @@
+"""Add search indexes.
+
+Revision ID: 3c1f9a6d2e80
+Revises: 76d2ff448ecf
+Create Date: 2026-10-17 00:24:51.306214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f9a6d2e80'
+down_revision = '76d2ff448ecf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('students', schema=None) as batch_op:
+        batch_op.create_index('ix_students_full_name', ['full_name'], unique=False)
+
+    # FULLTEXT indexes only exist on MySQL; search falls back to LIKE elsewhere
+    if op.get_bind().dialect.name == 'mysql':
+        op.create_index('ft_students_full_name_email', 'students', ['full_name', 'email'],
+                        unique=False, mysql_prefix='FULLTEXT')
+        op.create_index('ft_courses_title_code', 'courses', ['title', 'code'],
+                        unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'mysql':
+        op.drop_index('ft_courses_title_code', table_name='courses')
+        op.drop_index('ft_students_full_name_email', table_name='students')
+
+    with op.batch_alter_table('students', schema=None) as batch_op:
+        batch_op.drop_index('ix_students_full_name')
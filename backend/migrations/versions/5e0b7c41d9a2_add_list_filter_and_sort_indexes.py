@@ -0,0 +1,40 @@
+"""Add list filter and sort indexes.
+
+Revision ID: 5e0b7c41d9a2
+Revises: 3c1f9a6d2e80
+Create Date: 2026-10-17 00:33:07.518046
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e0b7c41d9a2'
+down_revision = '3c1f9a6d2e80'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('students', schema=None) as batch_op:
+        batch_op.create_index('ix_students_gender_age', ['gender', 'age'], unique=False)
+        batch_op.create_index(batch_op.f('ix_students_age'), ['age'], unique=False)
+        batch_op.create_index(batch_op.f('ix_students_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_students_updated_at'), ['updated_at'], unique=False)
+
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_courses_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_courses_updated_at'), ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_courses_updated_at'))
+        batch_op.drop_index(batch_op.f('ix_courses_created_at'))
+
+    with op.batch_alter_table('students', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_students_updated_at'))
+        batch_op.drop_index(batch_op.f('ix_students_created_at'))
+        batch_op.drop_index(batch_op.f('ix_students_age'))
+        batch_op.drop_index('ix_students_gender_age')
@@ -0,0 +1,42 @@
+"""Add enrollment counters to courses and students.
+
+Revision ID: 76d2ff448ecf
+Revises: 7af7e8f742e6
+Create Date: 2026-10-17 00:18:40.127553
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '76d2ff448ecf'
+down_revision = '7af7e8f742e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('enrollment_count', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('students', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('enrollment_count', sa.Integer(), server_default='0', nullable=False))
+
+    # backfill from the existing enrollments
+    op.execute(
+        "UPDATE courses SET enrollment_count = "
+        "(SELECT COUNT(*) FROM enrollments WHERE enrollments.course_id = courses.id)"
+    )
+    op.execute(
+        "UPDATE students SET enrollment_count = "
+        "(SELECT COUNT(*) FROM enrollments WHERE enrollments.student_id = students.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('students', schema=None) as batch_op:
+        batch_op.drop_column('enrollment_count')
+
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_column('enrollment_count')
@@ -0,0 +1,44 @@
+"""Add enrollment and email indexes.
+
+Revision ID: 7af7e8f742e6
+Revises: 0b82a20f2c40
+Create Date: 2026-10-17 00:06:12.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7af7e8f742e6'
+down_revision = '0b82a20f2c40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # remove duplicate enrollments so the unique index can be built, keeping the oldest row
+    op.execute(
+        "DELETE FROM enrollments WHERE id NOT IN ("
+        "SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM enrollments "
+        "GROUP BY student_id, course_id) AS keep)"
+    )
+
+    with op.batch_alter_table('enrollments', schema=None) as batch_op:
+        batch_op.create_index('uq_enrollments_student_course', ['student_id', 'course_id'], unique=True)
+        batch_op.create_index('ix_enrollments_course_student', ['course_id', 'student_id'], unique=False)
+
+    with op.batch_alter_table('students', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_students_email'), ['email'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('students', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_students_email'))
+
+    with op.batch_alter_table('enrollments', schema=None) as batch_op:
+        # MySQL needs an index on each foreign key column before the composite ones can go
+        batch_op.create_index('ix_enrollments_student_id', ['student_id'], unique=False)
+        batch_op.create_index('ix_enrollments_course_id', ['course_id'], unique=False)
+        batch_op.drop_index('ix_enrollments_course_student')
+        batch_op.drop_index('uq_enrollments_student_course')
@@ -0,0 +1,41 @@
+"""Add change feed tombstones.
+
+Revision ID: a4d83e5f1b27
+Revises: 5e0b7c41d9a2
+Create Date: 2026-10-17 00:41:26.904417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d83e5f1b27'
+down_revision = '5e0b7c41d9a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('tombstones', schema=None) as batch_op:
+        batch_op.create_index('ix_tombstones_entity_deleted_at', ['entity', 'deleted_at', 'entity_id'], unique=False)
+
+    with op.batch_alter_table('enrollments', schema=None) as batch_op:
+        batch_op.create_index('ix_enrollments_updated_at', ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('enrollments', schema=None) as batch_op:
+        batch_op.drop_index('ix_enrollments_updated_at')
+
+    with op.batch_alter_table('tombstones', schema=None) as batch_op:
+        batch_op.drop_index('ix_tombstones_entity_deleted_at')
+
+    op.drop_table('tombstones')
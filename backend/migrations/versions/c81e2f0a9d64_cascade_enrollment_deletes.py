@@ -0,0 +1,41 @@
+"""Cascade enrollment deletes in the database.
+
+Revision ID: c81e2f0a9d64
+Revises: a4d83e5f1b27
+Create Date: 2026-10-17 00:52:38.271940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81e2f0a9d64'
+down_revision = 'a4d83e5f1b27'
+branch_labels = None
+depends_on = None
+
+# names the unnamed foreign keys of the initial migration on SQLite (batch mode)
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+FOREIGN_KEYS = (('student_id', 'students'), ('course_id', 'courses'))
+
+
+def _recreate_foreign_keys(ondelete):
+    # MySQL generated names (enrollments_ibfk_1) or the names given by this migration
+    existing = {fk['constrained_columns'][0]: fk['name']
+                for fk in sa.inspect(op.get_bind()).get_foreign_keys('enrollments')}
+
+    with op.batch_alter_table('enrollments', schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+        for column, table in FOREIGN_KEYS:
+            name = f'fk_enrollments_{column}_{table}'
+            batch_op.drop_constraint(existing.get(column) or name, type_='foreignkey')
+            batch_op.create_foreign_key(name, table, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    _recreate_foreign_keys('CASCADE')
+
+
+def downgrade():
+    _recreate_foreign_keys(None)
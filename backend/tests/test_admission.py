@@ -0,0 +1,43 @@
+"""
+Admission slots are released when a request ends, whether or not the
+caller closes the response.
+
+Run from backend/:
+    python -m pytest tests
+"""
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("RESPONSE_CACHE_BACKEND", "none")
+os.environ.setdefault("COURSE_CACHE_TTL", "0")
+
+import pytest
+
+from app import app, db
+from app.utils import admission
+
+
+@pytest.fixture
+def client():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    return app.test_client()
+
+
+def test_sequential_requests_beyond_the_limit_are_admitted(client):
+    limit = admission.concurrency["expensive"]
+
+    # the responses are dropped without being closed
+    statuses = [client.get("/api/v1.0/students/all").status_code for _ in range(limit * 3)]
+
+    assert 503 not in statuses
+    assert admission.stats()["classes"]["expensive"]["in_flight"] == 0
+
+
+def test_streamed_response_holds_its_slot_until_closed(client):
+    response = client.get("/api/v1.0/students/all?stream=true")
+    assert admission.stats()["classes"]["expensive"]["in_flight"] == 1
+
+    response.close()
+    assert admission.stats()["classes"]["expensive"]["in_flight"] == 0
@@ -0,0 +1,67 @@
+"""
+The detail and list endpoints run a fixed number of SQL statements, however
+many rows they return (no N+1 queries).
+
+Run from backend/:
+    python -m pytest tests
+"""
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("RESPONSE_CACHE_BACKEND", "none")
+os.environ.setdefault("COURSE_CACHE_TTL", "0")
+
+import pytest
+from sqlalchemy import insert
+
+from app import app, db
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.student import Student
+from app.utils.query_counter import count_queries
+
+
+def create_rows(students, courses_per_student):
+    """`students` students, each enrolled in the same `courses_per_student` courses"""
+    db.session.execute(insert(Course), [
+        {"id": i, "title": f"Course {i}", "code": f"C{i}"} for i in range(1, courses_per_student + 1)])
+    db.session.execute(insert(Student), [
+        {"id": i, "full_name": f"Student {i}", "age": 20, "gender": "Female",
+         "email": f"student{i}@example.com", "enrollment_count": courses_per_student}
+        for i in range(1, students + 1)])
+    db.session.execute(insert(Enrollment), [
+        {"student_id": student_id, "course_id": course_id}
+        for student_id in range(1, students + 1) for course_id in range(1, courses_per_student + 1)])
+    db.session.commit()
+
+
+def queries_for(path, students, courses_per_student):
+    """Statements run by GET `path` against a fresh database of the given size"""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        create_rows(students, courses_per_student)
+
+    with count_queries() as queries:
+        with app.test_client().get(path) as response:
+            assert response.status_code == 200
+    return queries.count
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("/api/v1.0/students/1", 1),
+    ("/api/v1.0/students/1/courses", 1),
+    ("/api/v1.0/courses/1", 1),
+])
+def test_detail_query_count_is_fixed(path, expected):
+    assert queries_for(path, 1, 1) == queries_for(path, 1, 50) == expected
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("/api/v1.0/students/all", 1),
+    ("/api/v1.0/courses/all", 1),
+    # the course titles, the page of students, then their matching enrollments
+    ("/api/v1.0/students/by-course?course_titles=Course 1", 3),
+])
+def test_list_query_count_is_fixed(path, expected):
+    assert queries_for(path, 1, 1) == queries_for(path, 50, 1) == queries_for(path, 50, 50) == expected